@@ -28,6 +28,7 @@ class Ability(PokedexObject):
         Returns a string representation of the Ability object, including its name, ID, generation, effect,
         short effect, and Pokémon.
     """
+    __slots__ = ("generation", "effect", "effectShort", "pokemon")
 
     def __init__(self, name=None, id=None, generation=None, effect=None, effectShort=None, pokemon=None):
         """
@@ -49,86 +50,10 @@ class Ability(PokedexObject):
             The name of a Pokémon that can have this ability.
         """
         super().__init__(name, id)
-        self._generation = generation
-        self._effect = effect
-        self._effectShort = effectShort
-        self._pokemon = pokemon
-
-    @property
-    def generation(self):
-        """
-        str: The generation of Pokémon games in which the ability was introduced.
-        """
-        return self._generation
-
-    @generation.setter
-    def generation(self, value):
-        """
-        Set the generation of Pokémon games in which the ability was introduced.
-
-        Parameters:
-        -----------
-        value : str
-            The new generation value to set.
-        """
-        self._generation = value
-
-    @property
-    def effect(self):
-        """
-        str: A description of the ability's effect.
-        """
-        return self._effect
-
-    @effect.setter
-    def effect(self, value):
-        """
-        Set the description of the ability's effect.
-
-        Parameters:
-        -----------
-        value : str
-            The new effect value to set.
-        """
-        self._effect = value
-
-    @property
-    def effectShort(self):
-        """
-        str: A short description of the ability's effect.
-        """
-        return self._effectShort
-
-    @effectShort.setter
-    def effectShort(self, value):
-        """
-        Set the short description of the ability's effect.
-
-        Parameters:
-        -----------
-        value : str
-            The new effectShort value to set.
-        """
-        self._effectShort = value
-
-    @property
-    def pokemon(self):
-        """
-        str: The name of a Pokémon that can have this ability.
-        """
-        return self._pokemon
-
-    @pokemon.setter
-    def pokemon(self, value):
-        """
-        Set the name of a Pokémon that can have this ability.
-
-        Parameters:
-        -----------
-        value : str
-            The new pokemon value to set.
-        """
-        self._pokemon = value
+        self.generation = generation
+        self.effect = effect
+        self.effectShort = effectShort
+        self.pokemon = pokemon
 
     def __str__(self):
         return f"{self.name} is not valid" if self.name == "" else \
@@ -0,0 +1,211 @@
+import asyncio
+from collections import OrderedDict
+
+import aiohttp
+
+from decoder import JSONDecoder
+from metrics import Metrics
+from response_cache import ResponseCache
+from retry_policy import RetryPolicy
+from scheduler import RequestScheduler
+
+
+class PokeAPIClient:
+    """
+    A client for the PokeAPI that owns a single, connection-pooled aiohttp session.
+
+    One client is shared by every handler of a PokeDex so that all lookups, including the nested lookups made while
+    expanding a Pokémon, reuse the same keep-alive connections instead of paying a new handshake per request.
+
+    Requests are coalesced by (mode, name/id): concurrent callers asking for the same resource await one shared
+    future, and every unique resource is fetched exactly once until `clear_requests` is called. Only the
+    `max_completed` most recently used completed requests are kept, so memory stays flat over long streams of inputs;
+    requests still in flight are never forgotten.
+
+    When a ResponseCache is given, responses are read from it before going to the network and every response
+    fetched from the network is stored in it.
+
+    Every request to the network goes through a RequestScheduler, which bounds the number of requests in flight and
+    their rate. Its number of requests in flight is clamped to the number of connections of the pool, so requests wait
+    at the scheduler rather than for a connection inside aiohttp, where the wait would count against their timeout.
+    Transient failures are retried as decided by a RetryPolicy; requests answered with 429 Too Many Requests
+    additionally pause the scheduler for the Retry-After time.
+
+    :param api_url: The base URL of the API.
+    :param limit: The maximum number of simultaneous connections in the pool.
+    :param limit_per_host: The maximum number of simultaneous connections to a single host.
+    :param keepalive_timeout: The number of seconds an idle connection is kept open for reuse.
+    :param cache: The persistent cache of responses, or None to always use the network.
+    :param cache_bypass: Whether to skip reading from the cache while still storing fresh responses in it.
+    :param scheduler: The scheduler of requests to the network. Defaults to a RequestScheduler without a rate limit.
+    :param retry_policy: The policy for retrying failed requests. Defaults to a RetryPolicy with its default settings.
+    :param decoder: The decoder of response bodies. Defaults to a JSONDecoder using the fastest installed backend.
+    :param max_completed: The maximum number of keys of completed requests kept for coalescing.
+    """
+    API_URL = "https://pokeapi.co/api/v2/"
+
+    def __init__(self, api_url=API_URL, limit=100, limit_per_host=10, keepalive_timeout=30, cache=None,
+                 cache_bypass=False, scheduler=None, retry_policy=None, decoder=None, max_completed=128):
+        """
+        Constructor for the PokeAPIClient class.
+
+        :param api_url: The base URL of the API.
+        :param limit: The maximum number of simultaneous connections in the pool.
+        :param limit_per_host: The maximum number of simultaneous connections to a single host.
+        :param keepalive_timeout: The number of seconds an idle connection is kept open for reuse.
+        :param cache: The persistent cache of responses, or None to always use the network.
+        :param cache_bypass: Whether to skip reading from the cache while still storing fresh responses in it.
+        :param scheduler: The scheduler of requests to the network. Defaults to a RequestScheduler without a rate
+                          limit.
+        :param retry_policy: The policy for retrying failed requests. Defaults to a RetryPolicy with its default
+                             settings.
+        :param decoder: The decoder of response bodies. Defaults to a JSONDecoder using the fastest installed backend.
+        :param max_completed: The maximum number of keys of completed requests kept for coalescing.
+        """
+        self.api_url = api_url
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._session = None
+        self._requests = {}
+        self._completed = OrderedDict()
+        self.max_completed = max_completed
+        self.cache = cache
+        self.cache_bypass = cache_bypass
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler()
+        self.scheduler.clamp(min(limit, limit_per_host))
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.decoder = decoder if decoder is not None else JSONDecoder()
+        self.metrics = Metrics()
+
+    @property
+    def session(self):
+        """
+        The shared session. It is created on first use so that it is bound to the running event loop.
+
+        :return: The pooled aiohttp session.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit_per_host,
+                                             keepalive_timeout=self._keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def get_request(self, mode, single_input):
+        """
+        Get the JSON of a single resource, sharing the request with every other caller asking for the same resource.
+
+        :param mode: The API mode to use for the request.
+        :param single_input: The input value to request data for.
+        :return: The JSON response for the request, or None if an error occurred.
+        """
+        key = (mode, str(single_input))
+        future = self._requests.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(mode, single_input))
+            future.add_done_callback(lambda done: self._complete(mode, key, done))
+            self._requests[key] = future
+        elif key in self._completed:
+            self._completed.move_to_end(key)
+        return await asyncio.shield(future)
+
+    def _complete(self, mode, key, future):
+        """
+        Register a completed request under both the name and the id of the fetched resource, so a later lookup by
+        the other key shares the same result, and forget the least recently used completed requests beyond
+        `max_completed`.
+
+        :param mode: The API mode of the request.
+        :param key: The key the request was made under.
+        :param future: The completed request.
+        """
+        keys = [key]
+        if not future.cancelled() and future.exception() is None and isinstance(future.result(), dict):
+            response = future.result()
+            for alias in (response.get("name"), response.get("id")):
+                if alias is not None:
+                    keys.append((mode, str(alias)))
+                    self._requests.setdefault(keys[-1], future)
+        for key in keys:
+            if self._requests.get(key) is future:
+                self._completed[key] = None
+                self._completed.move_to_end(key)
+        while len(self._completed) > self.max_completed:
+            evicted, _ = self._completed.popitem(last=False)
+            del self._requests[evicted]
+
+    def clear_requests(self):
+        """
+        Forget the coalesced requests, so the next lookup of every resource goes to the API again.
+        """
+        self._requests.clear()
+        self._completed.clear()
+
+    async def _fetch(self, mode, single_input):
+        """
+        Get the JSON of a single input value from the cache, or from the PokeAPI if it is not cached.
+
+        :param mode: The API mode to use for the request.
+        :param single_input: The input value to request data for.
+        :return: The JSON response for the request, or None if an error occurred.
+        """
+        end_point = f"{mode}/{single_input}"
+        content = None
+        if self.cache is not None and not self.cache_bypass:
+            content = self.cache.get(end_point)
+            self.metrics.increment("response_cache_misses" if content is None else "response_cache_hits")
+        if content is None:
+            content = await self._download(end_point)
+            if content is None:
+                self.metrics.increment("request_failures")
+                return None
+            self.metrics.increment("bytes_fetched", len(content))
+            if self.cache is not None:
+                self.cache.put(end_point, content)
+        with self.metrics.stage("JSON decoding", 1):
+            return self.decoder.decode(content, mode)
+
+    async def _download(self, end_point):
+        """
+        Make an asynchronous request to the PokeAPI for a single endpoint, once the scheduler allows it, retrying
+        transient failures.
+
+        :param end_point: The endpoint to request, relative to the API URL.
+        :return: The raw body of the response, ResponseCache.NOT_FOUND if the endpoint does not exist, or None if
+                 another permanent error occurred or every attempt failed.
+        """
+        policy = self.retry_policy
+        timeout = aiohttp.ClientTimeout(total=policy.timeout)
+        for attempt in range(1, policy.max_attempts + 1):
+            self.metrics.increment("requests")
+            if attempt > 1:
+                self.metrics.increment("retries")
+            try:
+                async with self.scheduler.slot():
+                    async with self.session.get(f"{self.api_url}{end_point}", timeout=timeout) as response:
+                        if response.status == 404:
+                            return ResponseCache.NOT_FOUND
+                        if response.status == 429:
+                            self.scheduler.pause(RequestScheduler.retry_after(response.headers.get("Retry-After")))
+                            continue
+                        if response.status >= 400 and not policy.is_transient(response.status):
+                            return None
+                        response.raise_for_status()
+                        return await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            if attempt < policy.max_attempts:
+                await asyncio.sleep(policy.delay(attempt))
+        return None
+
+    async def close(self):
+        """
+        Close the shared session, release its pooled connections and close the cache.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self.clear_requests()
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import zlib
+
+from aiohttp import web
+
+from api_client import PokeAPIClient
+from pokedex import PokeDex, PokedexMode
+from request import Request
+from retry_policy import RetryPolicy
+from scheduler import RequestScheduler
+
+
+class MockPokeAPI:
+    """
+    A local aiohttp server that imitates the PokeAPI by serving the fixtures in `testjsons/`.
+
+    Every name or id of a mode is answered with the fixture of that mode, renamed and given a stable id of its own, so
+    inputs look like distinct resources. Names starting with "missing" are answered with 404 Not Found.
+
+    :param fixtures_dir: The directory holding `pokemon.json`, `move.json`, `ability.json` and `stat.json`.
+    :param latency: The number of seconds every response is delayed by.
+    :param error_rate: The probability that a response is a 503 Service Unavailable.
+    """
+    MODES = ("pokemon", "move", "ability", "stat")
+    NAME_PLACEHOLDER = "__mock_name__"
+    ID_PLACEHOLDER = 987654321
+
+    def __init__(self, fixtures_dir="testjsons", latency=0.0, error_rate=0.0):
+        """
+        Constructor for the MockPokeAPI class.
+
+        :param fixtures_dir: The directory holding the fixtures of every mode.
+        :param latency: The number of seconds every response is delayed by.
+        :param error_rate: The probability that a response is a 503 Service Unavailable.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._templates = {}
+        for mode in self.MODES:
+            with open(os.path.join(fixtures_dir, f"{mode}.json")) as file:
+                fixture = json.load(file)
+            fixture.update(name=self.NAME_PLACEHOLDER, id=self.ID_PLACEHOLDER)
+            self._templates[mode] = json.dumps(fixture).encode('utf-8')
+        self._runner = None
+        self.url = None
+
+    async def start(self):
+        """
+        Start serving on a free local port.
+
+        :return: The base URL of the mock API.
+        """
+        app = web.Application()
+        app.router.add_get("/api/v2/{mode}/{name}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/api/v2/"
+        return self.url
+
+    async def stop(self):
+        """
+        Stop serving.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request):
+        """
+        Answer a single request with the fixture of its mode. The fixtures are encoded once, and only their name and
+        id are substituted per request, so the mock spends as little of the shared CPU as possible.
+
+        :param request: The incoming request.
+        :return: The response.
+        """
+        self.requests += 1
+        mode, name = request.match_info["mode"], request.match_info["name"]
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if mode not in self._templates or name.startswith("missing"):
+            return web.Response(status=404)
+        if random.random() < self.error_rate:
+            return web.Response(status=503)
+        resource_id = int(name) if name.isdecimal() else zlib.crc32(name.encode()) % 1000000
+        body = self._templates[mode].replace(json.dumps(self.NAME_PLACEHOLDER).encode('utf-8'),
+                                             json.dumps(name).encode('utf-8'), 1)
+        body = body.replace(str(self.ID_PLACEHOLDER).encode('utf-8'), str(resource_id).encode('utf-8'), 1)
+        return web.Response(body=body, content_type="application/json")
+
+
+class TimedPokeAPIClient(PokeAPIClient):
+    """
+    A PokeAPIClient that records the latency of every lookup.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Constructor for the TimedPokeAPIClient class. Takes the same arguments as PokeAPIClient.
+        """
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+
+    async def get_request(self, mode, single_input):
+        """
+        Get the JSON of a single resource and record how long the lookup took.
+
+        :param mode: The API mode to use for the request.
+        :param single_input: The input value to request data for.
+        :return: The JSON response for the request, or None if an error occurred.
+        """
+        start = time.perf_counter()
+        try:
+            return await super().get_request(mode, single_input)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+def percentile(values, percent):
+    """
+    Get a percentile of a list of values.
+
+    :param values: The values.
+    :param percent: The percentile to get, from 1 to 99.
+    :return: The percentile, or 0 if there are fewer than two values.
+    """
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+async def run_once(api_url, chain, size, concurrency, trace_memory=False):
+    """
+    Time a single request of a chain against the mock API.
+
+    :param api_url: The base URL of the mock API.
+    :param chain: The chain to benchmark, "pokemon", "move", "ability" or "expanded".
+    :param size: The number of inputs of the request.
+    :param concurrency: The maximum number of requests in flight.
+    :param trace_memory: Whether to measure the peak memory allocated while executing the request. The mock API runs
+                         in the same process, so its allocations are included.
+    :return: A tuple of the wall time in seconds, the lookup latencies and the peak memory in bytes.
+    """
+    mode = "pokemon" if chain == "expanded" else chain
+    client = TimedPokeAPIClient(api_url=api_url, limit_per_host=concurrency,
+                                scheduler=RequestScheduler(max_in_flight=concurrency),
+                                retry_policy=RetryPolicy(backoff=0.01, max_backoff=0.1))
+    request = Request()
+    request.poke_dex_mode = PokedexMode(mode)
+    request.expanded = chain == "expanded"
+    request.data_input = [f"{mode}-{index}" for index in range(size)]
+    request.output_type = os.devnull
+    async with PokeDex(client=client, max_concurrency=concurrency, entity_cache_size=0) as pokedex:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        await pokedex.execute_request(request)
+        seconds = time.perf_counter() - start
+        peak = 0
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return seconds, client.latencies, peak
+
+
+async def run_benchmarks(args):
+    """
+    Run every combination of chain, input size and concurrency level against a mock API.
+
+    :param args: The parsed command line arguments.
+    :return: A list of result dictionaries, one per combination.
+    """
+    mock = MockPokeAPI(args.fixtures, latency=args.latency, error_rate=args.error_rate)
+    api_url = await mock.start()
+    results = []
+    try:
+        for chain in args.chains:
+            for size in args.sizes:
+                for concurrency in args.concurrency:
+                    durations, latencies = [], []
+                    for _ in range(args.repeat):
+                        seconds, run_latencies, _ = await run_once(api_url, chain, size, concurrency)
+                        durations.append(seconds)
+                        latencies.extend(run_latencies)
+                    _, _, peak = await run_once(api_url, chain, size, concurrency, trace_memory=True)
+                    seconds = statistics.median(durations)
+                    results.append({
+                        "chain": chain, "size": size, "concurrency": concurrency, "seconds": seconds,
+                        "throughput": size / seconds if seconds else 0.0,
+                        "p50": percentile(latencies, 50), "p95": percentile(latencies, 95),
+                        "p99": percentile(latencies, 99), "peak_memory": peak,
+                    })
+                    print_result(results[-1])
+    finally:
+        await mock.stop()
+    return results
+
+
+def print_result(result):
+    """
+    Print a single result as a row of the report.
+
+    :param result: The result dictionary.
+    """
+    print(f"{result['chain']:<9} size={result['size']:<6} concurrency={result['concurrency']:<4} "
+          f"{result['throughput']:>9.1f} items/s  p50={result['p50'] * 1000:>7.1f}ms  "
+          f"p95={result['p95'] * 1000:>7.1f}ms  p99={result['p99'] * 1000:>7.1f}ms  "
+          f"peak={result['peak_memory'] / 1024 / 1024:>7.1f}MB")
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline and list the combinations whose throughput regressed.
+
+    :param results: The results of this run.
+    :param baseline: The results of an earlier run.
+    :param tolerance: The fraction by which throughput may drop before it counts as a regression.
+    :return: A list of messages, one per regression.
+    """
+    previous = {(result["chain"], result["size"], result["concurrency"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["chain"], result["size"], result["concurrency"]))
+        if old is not None and result["throughput"] < old["throughput"] * (1 - tolerance):
+            regressions.append(f"{result['chain']} size={result['size']} concurrency={result['concurrency']}: "
+                               f"{old['throughput']:.1f} -> {result['throughput']:.1f} items/s")
+    return regressions
+
+
+def main():
+    """
+    Benchmark the handler chains of the PokeDex against a local mock PokeAPI.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the PokeDex handler chains against a mock PokeAPI.")
+    parser.add_argument("--chains", nargs='+', default=["pokemon", "move", "ability", "expanded"],
+                        choices=["pokemon", "move", "ability", "expanded"], help="The chains to benchmark.")
+    parser.add_argument("--sizes", nargs='+', type=int, default=[10, 100, 1000],
+                        help="The numbers of inputs per request.")
+    parser.add_argument("--concurrency", nargs='+', type=int, default=[10, 50],
+                        help="The maximum numbers of requests in flight.")
+    parser.add_argument("--latency", type=float, default=0.02, help="The latency in seconds of the mock API.")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="The probability that the mock API answers with a 503.")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of timed runs per combination.")
+    parser.add_argument("--fixtures", default="testjsons", help="The directory of the fixtures served by the mock.")
+    parser.add_argument("--save", default=None, help="A JSON file to write the results to.")
+    parser.add_argument("--baseline", default=None,
+                        help="A JSON file of earlier results. The run fails if throughput regressed.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="The fraction by which throughput may drop before it counts as a regression.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmarks(args))
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
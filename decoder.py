@@ -0,0 +1,120 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _english(entries):
+    """
+    Keep only the English entries of a list of localised entries.
+
+    :param entries: The localised entries, each with a "language" reference.
+    :return: The English entries.
+    """
+    return [entry for entry in entries if entry.get("language", {}).get("name") == "en"]
+
+
+def _named(reference):
+    """
+    Strip a named API reference down to its name.
+
+    :param reference: A {"name": ..., "url": ...} reference, or None.
+    :return: A {"name": ...} reference, or None.
+    """
+    return None if reference is None else {"name": reference["name"]}
+
+
+def prune(mode, data):
+    """
+    Strip the JSON of a resource down to the fields the populate handlers read, dropping large unused subtrees such as
+    `game_indices`, `sprites` and all but the first `version_group_details` of every move of a Pokémon.
+
+    Pruning an already pruned resource returns an equal resource.
+
+    :param mode: The mode of the resource.
+    :param data: The JSON of the resource, as returned by the API.
+    :return: The pruned JSON. Resources of unknown modes and other documents, such as listings, are returned unchanged.
+    """
+    if not isinstance(data, dict) or "id" not in data:
+        return data
+    if mode == "pokemon":
+        return {
+            "id": data["id"], "name": data["name"], "height": data["height"], "weight": data["weight"],
+            "stats": [{"base_stat": stat["base_stat"], "stat": _named(stat["stat"])} for stat in data["stats"]],
+            "types": [{"slot": specific_type["slot"], "type": _named(specific_type["type"])}
+                      for specific_type in data["types"]],
+            "abilities": [{"ability": _named(ability["ability"])} for ability in data["abilities"]],
+            "moves": [{"move": _named(move["move"]),
+                       "version_group_details": [{"level_learned_at": detail["level_learned_at"]}
+                                                 for detail in move["version_group_details"][:1]]}
+                      for move in data["moves"]],
+        }
+    if mode == "move":
+        return {
+            "id": data["id"], "name": data["name"], "generation": _named(data["generation"]),
+            "accuracy": data["accuracy"], "pp": data["pp"], "power": data["power"], "type": _named(data["type"]),
+            "damage_class": _named(data["damage_class"]),
+            "effect_entries": [{"short_effect": entry["short_effect"], "language": {"name": "en"}}
+                               for entry in _english(data["effect_entries"])],
+        }
+    if mode == "ability":
+        return {
+            "id": data["id"], "name": data["name"], "generation": _named(data["generation"]),
+            "effect_entries": [{"effect": entry["effect"], "language": {"name": "en"}}
+                               for entry in _english(data["effect_entries"])],
+            "pokemon": [{"pokemon": _named(pokemon["pokemon"])} for pokemon in data["pokemon"]],
+        }
+    if mode == "stat":
+        return {"id": data["id"], "name": data["name"], "is_battle_only": data["is_battle_only"],
+                "move_damage_class": data["move_damage_class"]}
+    return data
+
+
+class JSONDecoder:
+    """
+    Decodes the raw bodies of PokeAPI responses.
+
+    The fastest available backend is used: orjson, then ujson, then the standard library. Bodies are decoded straight
+    from bytes, and resources can be pruned right after parsing so that only the fields the populate handlers read
+    are kept in memory.
+
+    :param backend: "orjson", "ujson" or "json", or None to use the fastest one installed.
+    :param prune_fields: Whether to prune every decoded resource with `prune`.
+    """
+    BACKENDS = ("orjson", "ujson", "json")
+
+    def __init__(self, backend=None, prune_fields=True):
+        """
+        Constructor for the JSONDecoder class.
+
+        :param backend: "orjson", "ujson" or "json", or None to use the fastest one installed.
+        :param prune_fields: Whether to prune every decoded resource with `prune`.
+        """
+        available = {"orjson": orjson, "ujson": ujson, "json": json}
+        if backend is None:
+            backend = next(name for name in self.BACKENDS if available[name] is not None)
+        elif available.get(backend) is None:
+            raise ValueError(f"The JSON backend '{backend}' is not installed.")
+        self.backend = backend
+        self.prune_fields = prune_fields
+        self._loads = available[backend].loads
+
+    def decode(self, content, mode=None):
+        """
+        Decode the raw body of a response.
+
+        :param content: The raw body, as bytes.
+        :param mode: The mode of the resource, used to prune it.
+        :return: The decoded, and possibly pruned, JSON.
+        """
+        data = self._loads(content)
+        if self.prune_fields and mode is not None:
+            return prune(mode, data)
+        return data
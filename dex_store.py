@@ -0,0 +1,320 @@
+import array
+import math
+import operator
+import statistics
+
+from decoder import JSONDecoder
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Table:
+    """
+    A table of equally long columns, one value per row, for filtering, sorting and aggregating many resources at once.
+
+    With NumPy installed every column is a NumPy array and every operation is vectorised. Without it, numeric columns
+    are `array.array`s, string columns are lists, and the same operations run as plain loops. Missing numbers, such as
+    the power of a status move, are stored as NaN and never match a comparison or count towards an aggregate.
+
+    Usage: `fast = table.filter(table.mask("speed", ">", 100), table.mask(("type_1", "type_2"), "==", "electric"))`
+
+    :param columns: A dictionary mapping every column name to its column.
+    """
+    OPERATORS = {"<": operator.lt, "<=": operator.le, "==": operator.eq, "!=": operator.ne, ">": operator.gt,
+                 ">=": operator.ge}
+    AGGREGATES = ("count", "sum", "mean", "min", "max")
+
+    def __init__(self, columns):
+        """
+        Constructor for the Table class.
+
+        :param columns: A dictionary mapping every column name to its column.
+        """
+        self.columns = columns
+
+    @classmethod
+    def from_rows(cls, schema, rows):
+        """
+        Build a table from rows.
+
+        :param schema: A dictionary mapping every column name to its kind, "int", "float" or "str".
+        :param rows: The rows, each a dictionary holding a value for every column. Missing floats may be None.
+        :return: A new Table.
+        """
+        columns = {}
+        for name, kind in schema.items():
+            values = [row[name] for row in rows]
+            if kind == "float":
+                values = [math.nan if value is None else value for value in values]
+            columns[name] = cls.column(kind, values)
+        return cls(columns)
+
+    @staticmethod
+    def column(kind, values):
+        """
+        Build a single column.
+
+        :param kind: The kind of the values, "int", "float" or "str".
+        :param values: The values of the column.
+        :return: A NumPy array, or an `array.array` or a list if NumPy is not installed.
+        """
+        if numpy is not None:
+            return numpy.array(values, dtype={"int": numpy.int64, "float": numpy.float64, "str": str}[kind])
+        if kind == "str":
+            return list(values)
+        return array.array("q" if kind == "int" else "d", values)
+
+    def __len__(self):
+        """
+        :return: The number of rows.
+        """
+        return len(next(iter(self.columns.values()), ()))
+
+    def __getitem__(self, name):
+        """
+        :param name: The name of a column.
+        :return: The column.
+        """
+        return self.columns[name]
+
+    @property
+    def column_names(self):
+        """
+        The names of the columns, in order.
+        """
+        return list(self.columns)
+
+    def mask(self, column, op, value):
+        """
+        Compare every row of a column with a value.
+
+        :param column: The name of the column, or a tuple of names to match a row if any of the columns matches.
+        :param op: The comparison, one of "<", "<=", "==", "!=", ">" and ">=".
+        :param value: The value to compare with.
+        :return: A boolean mask with one entry per row, to be passed to `filter`.
+        """
+        compare = self.OPERATORS[op]
+        names = (column,) if isinstance(column, str) else column
+        if numpy is not None:
+            result = numpy.zeros(len(self), dtype=bool)
+            for name in names:
+                result |= compare(self.columns[name], value)
+            return result
+        return [any(compare(self.columns[name][row], value) for name in names) for row in range(len(self))]
+
+    def filter(self, *masks):
+        """
+        Keep the rows that match every mask.
+
+        :param masks: The masks built by `mask`.
+        :return: A new Table holding the matching rows, in order.
+        """
+        if numpy is not None:
+            keep = numpy.logical_and.reduce(masks) if masks else numpy.ones(len(self), dtype=bool)
+            return self.take(numpy.flatnonzero(keep))
+        return self.take([row for row in range(len(self)) if all(mask[row] for mask in masks)])
+
+    def sort(self, column, descending=False):
+        """
+        Sort the rows by a column. The sort is stable and rows missing a value always come last.
+
+        :param column: The name of the column to sort by.
+        :param descending: Whether to sort from the largest value to the smallest.
+        :return: A new sorted Table.
+        """
+        values = self.columns[column]
+        missing = self._missing(values)
+        if numpy is not None:
+            present = numpy.flatnonzero(~missing)
+            if descending:
+                # Sorting the reversed values and reversing the result keeps equal values in their original order.
+                present = present[::-1]
+            order = present[numpy.argsort(values[present], kind="stable")]
+            if descending:
+                order = order[::-1]
+            return self.take(numpy.concatenate([order, numpy.flatnonzero(missing)]))
+        present = [row for row in range(len(self)) if not missing[row]]
+        order = sorted(present, key=values.__getitem__, reverse=descending)
+        return self.take(order + [row for row in range(len(self)) if missing[row]])
+
+    def aggregate(self, column, how="mean", by=None):
+        """
+        Reduce a column to a single value, or to one value per group.
+
+        :param column: The name of the column to reduce.
+        :param how: The reduction, one of "count", "sum", "mean", "min" and "max". Missing values are skipped.
+        :param by: The name of a column to group the rows by, or None to reduce every row together.
+        :return: The reduced value, or a dictionary mapping every group to its value if `by` is given. Groups without
+                 values reduce to None, except for "count", which reduces them to 0.
+        """
+        if how not in self.AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{how}', expected one of {', '.join(self.AGGREGATES)}.")
+        values = self.columns[column]
+        present = ~self._missing(values) if numpy is not None else [not missing for missing in self._missing(values)]
+        if by is None:
+            return self._reduce(self._select(values, present), how)
+        keys = self.columns[by]
+        if numpy is not None:
+            return {key.item(): self._reduce(values[present & (keys == key)], how) for key in numpy.unique(keys)}
+        groups = {}
+        for row in range(len(self)):
+            group = groups.setdefault(keys[row], [])
+            if present[row]:
+                group.append(values[row])
+        return {key: self._reduce(groups[key], how) for key in sorted(groups)}
+
+    def take(self, rows):
+        """
+        Select rows by position.
+
+        :param rows: The positions of the rows, in the order to keep them in.
+        :return: A new Table holding the selected rows.
+        """
+        if numpy is not None:
+            return Table({name: column[rows] for name, column in self.columns.items()})
+        return Table({name: self._select(column, rows) for name, column in self.columns.items()})
+
+    def rows(self):
+        """
+        :return: A list of the rows, each a dictionary mapping every column name to its value. Missing numbers are
+                 None.
+        """
+        columns = {name: [None if isinstance(value, float) and math.isnan(value) else value
+                          for value in (column.tolist() if hasattr(column, "tolist") else column)]
+                   for name, column in self.columns.items()}
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    @staticmethod
+    def _missing(values):
+        """
+        Find the missing values of a column.
+
+        :param values: The column.
+        :return: A boolean mask that is true for every NaN.
+        """
+        if numpy is not None:
+            return numpy.isnan(values) if values.dtype.kind == "f" else numpy.zeros(len(values), dtype=bool)
+        return [isinstance(value, float) and math.isnan(value) for value in values]
+
+    @staticmethod
+    def _select(column, rows):
+        """
+        Select values of a column without NumPy.
+
+        :param column: The column.
+        :param rows: Either the positions of the values, or a boolean mask.
+        :return: A column of the same type holding the selected values.
+        """
+        if numpy is not None:
+            return column[rows]
+        if len(rows) == len(column) and all(isinstance(row, bool) for row in rows):
+            rows = [position for position, keep in enumerate(rows) if keep]
+        selected = [column[row] for row in rows]
+        return array.array(column.typecode, selected) if isinstance(column, array.array) else selected
+
+    @staticmethod
+    def _reduce(values, how):
+        """
+        Reduce values without missing ones.
+
+        :param values: The values.
+        :param how: The reduction, one of "count", "sum", "mean", "min" and "max".
+        :return: The reduced value as a Python number, or None if there are no values to reduce.
+        """
+        if how == "count":
+            return len(values)
+        if len(values) == 0:
+            return None
+        if numpy is not None:
+            return getattr(numpy, how)(values).item()
+        return {"sum": sum, "mean": statistics.fmean, "min": min, "max": max}[how](values)
+
+
+class DexStore:
+    """
+    A columnar, in-memory copy of the Pokémon and moves of a Snapshot, for analytical queries over the whole dex.
+
+    Usage: `store = DexStore.from_snapshot(Snapshot("snapshot"))`, then for example
+    `store.moves.aggregate("power", "mean", by="generation")`.
+
+    :param pokemon: The table of Pokémon, with the columns of `POKEMON_SCHEMA`.
+    :param moves: The table of moves, with the columns of `MOVE_SCHEMA`.
+    """
+    STATS = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+    POKEMON_SCHEMA = {"id": "int", "name": "str", "height": "int", "weight": "int", "type_1": "str", "type_2": "str",
+                      **{stat.replace("-", "_"): "int" for stat in STATS}}
+    MOVE_SCHEMA = {"id": "int", "name": "str", "generation": "str", "type": "str", "damage_class": "str",
+                   "power": "float", "accuracy": "float", "pp": "float"}
+
+    def __init__(self, pokemon, moves):
+        """
+        Constructor for the DexStore class.
+
+        :param pokemon: The table of Pokémon, with the columns of `POKEMON_SCHEMA`.
+        :param moves: The table of moves, with the columns of `MOVE_SCHEMA`.
+        """
+        self.pokemon = pokemon
+        self.moves = moves
+
+    @classmethod
+    def from_snapshot(cls, snapshot, decoder=None):
+        """
+        Load every Pokémon and move of a snapshot.
+
+        :param snapshot: The snapshot to load.
+        :param decoder: The decoder of the stored resources. Defaults to a JSONDecoder using the fastest installed
+                        backend.
+        :return: A new DexStore.
+        """
+        decoder = decoder if decoder is not None else JSONDecoder()
+
+        def load(mode):
+            resources = []
+            for resource_id in sorted(set(snapshot.index.get(mode, {}).values())):
+                content = snapshot.read(mode, resource_id)
+                if content is not None:
+                    resources.append(decoder.decode(content, mode))
+            return resources
+
+        return cls.from_resources(load("pokemon"), load("move"))
+
+    @classmethod
+    def from_resources(cls, pokemon, moves):
+        """
+        Build a store from the JSON of Pokémon and moves, as returned by the PokeAPI.
+
+        :param pokemon: The JSON of every Pokémon.
+        :param moves: The JSON of every move.
+        :return: A new DexStore.
+        """
+        return cls(Table.from_rows(cls.POKEMON_SCHEMA, [cls.pokemon_row(info) for info in pokemon]),
+                   Table.from_rows(cls.MOVE_SCHEMA, [cls.move_row(info) for info in moves]))
+
+    @classmethod
+    def pokemon_row(cls, info):
+        """
+        Flatten the JSON of a Pokémon into a row of the Pokémon table.
+
+        :param info: The JSON of the Pokémon.
+        :return: A dictionary holding a value for every column of `POKEMON_SCHEMA`.
+        """
+        types = [specific_type["type"]["name"] for specific_type in sorted(info["types"], key=lambda t: t["slot"])]
+        stats = {stat["stat"]["name"]: stat["base_stat"] for stat in info["stats"]}
+        return {"id": info["id"], "name": info["name"], "height": info["height"], "weight": info["weight"],
+                "type_1": types[0] if types else "", "type_2": types[1] if len(types) > 1 else "",
+                **{stat.replace("-", "_"): stats.get(stat, 0) for stat in cls.STATS}}
+
+    @staticmethod
+    def move_row(info):
+        """
+        Flatten the JSON of a move into a row of the move table.
+
+        :param info: The JSON of the move.
+        :return: A dictionary holding a value for every column of `MOVE_SCHEMA`.
+        """
+        return {"id": info["id"], "name": info["name"], "generation": info["generation"]["name"],
+                "type": info["type"]["name"], "damage_class": info["damage_class"]["name"], "power": info["power"],
+                "accuracy": info["accuracy"], "pp": info["pp"]}
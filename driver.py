@@ -2,24 +2,35 @@
 # Student number: A01169131 & A01264033
 import argparse
 import asyncio
+import sys
+from decoder import JSONDecoder
+from inverted_index import InvertedIndex
+from output_writer import FORMATS, ParquetWriter
 from pokedex import PokeDex, PokedexMode
 from request import Request
+from response_cache import ResponseCache
+from retry_policy import RetryPolicy
+from scheduler import RequestScheduler
+from server import PokedexServer
+from snapshot import Snapshot, SnapshotBuilder, SnapshotClient
 
 
-
-
-
-def setup_request_commandline() -> Request:
+def setup_commandline() -> argparse.Namespace:
     """
-    Sets up a command line interface to take in user inputs and creates a Request object.
+    Sets up a command line interface to take in user inputs.
 
     Returns:
-        Request: An object containing user inputs for the PokeDex API request.
+        argparse.Namespace: The parsed command line arguments.
     """
     parser = argparse.ArgumentParser()
 
-    parser.add_argument("mode", choices=['pokemon', 'move', 'ability'], help="The mode to use to set teh Pokedex."
-                                                                             " It can be {'pokemon' | 'ability' | 'move'}")
+    parser.add_argument("mode", choices=['pokemon', 'move', 'ability', 'pokemon-by-move', 'pokemon-by-type',
+                                         'pokemon-by-ability', 'generation', 'batch', 'snapshot', 'serve'],
+                        help="The mode to use to set teh Pokedex. It can be {'pokemon' | 'ability' | 'move'}, a "
+                             "reverse lookup answered from the local snapshot {'pokemon-by-move' | 'pokemon-by-type' | "
+                             "'pokemon-by-ability' | 'generation'}, 'batch' for inputs of mixed modes given as "
+                             "'mode:input' lines or JSON lines, 'snapshot' to mirror the PokeAPI into the local "
+                             "snapshot used by --offline, or 'serve' to answer lookups over HTTP.")
     parser.add_argument("--inputfile", help="The inputfile is used pass inputs to the program. "
                                             "Input file has to be .txt format.")
     parser.add_argument("--inputdata", help="The inputdata is used to pass inputs to the program. "
@@ -30,16 +41,121 @@ def setup_request_commandline() -> Request:
     parser.add_argument("--output", default=None, help="When this provided with filename and .txt extension, "
                                                        "then the output will printed to specified textfile. If it is "
                                                        "not provided it will be logged to the console.")
+    parser.add_argument("--format", choices=list(FORMATS), default="text",
+                        help="The format of the output: the human-readable 'text' of every entity, or its fields as "
+                             "'jsonl', 'csv' or 'parquet'. Parquet requires pyarrow and an --output file.")
+    parser.add_argument("--stream", action='store_true',
+                        help="When this is provided, the inputfile is read lazily and processed and output in windows.")
+    parser.add_argument("--window-size", type=int, default=PokeDex.WINDOW_SIZE,
+                        help="The number of inputs processed per window when streaming. Windows are pipelined through "
+                             "the handlers, so small windows are output early without slowing the stream down.")
+    parser.add_argument("--pipeline-workers", type=int, default=8,
+                        help="The number of windows fetched and expanded at the same time when streaming.")
+    parser.add_argument("--limit-per-host", type=int, default=10,
+                        help="The maximum number of simultaneous connections kept open to the PokeAPI.")
+    parser.add_argument("--keepalive", type=float, default=30,
+                        help="The number of seconds an idle connection to the PokeAPI is kept open for reuse.")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="The maximum number of requests to the PokeAPI in flight at the same time. Defaults to, "
+                             "and cannot exceed, --limit-per-host, so requests never wait for a connection.")
+    parser.add_argument("--rate-limit", type=float, default=None,
+                        help="The maximum number of requests to the PokeAPI started per second. Unlimited by default.")
+    parser.add_argument("--burst", type=float, default=None,
+                        help="The maximum number of requests started at once after an idle period. Defaults to the "
+                             "rate limit.")
+    parser.add_argument("--retries", type=int, default=4,
+                        help="The maximum number of attempts per request when the PokeAPI fails transiently.")
+    parser.add_argument("--retry-backoff", type=float, default=0.5,
+                        help="The delay in seconds before the first retry. It doubles with every further retry.")
+    parser.add_argument("--retry-max-backoff", type=float, default=10.0,
+                        help="The maximum delay in seconds between two attempts.")
+    parser.add_argument("--retry-jitter", type=float, default=1.0,
+                        help="The fraction of the retry delay that is randomised, from 0 to 1.")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="The maximum number of seconds a single request to the PokeAPI may take.")
+    parser.add_argument("--json-backend", choices=JSONDecoder.BACKENDS, default=None,
+                        help="The library used to decode responses. The fastest installed one is used by default.")
+    parser.add_argument("--no-prune", action='store_true',
+                        help="When this is provided, decoded responses keep the fields the Pokedex does not use.")
+    parser.add_argument("--resolve-names", action='store_true',
+                        help="When this is provided, inputs are resolved against the list of every name of the mode, "
+                             "fetched once, so misspelled and unknown inputs are rejected with a suggestion instead "
+                             "of being requested.")
+    parser.add_argument("--cache", action='store_true',
+                        help="When this is provided, responses are stored in and read from a persistent cache.")
+    parser.add_argument("--cache-path", default=".pokedex_cache.sqlite", help="The path of the cache file.")
+    parser.add_argument("--cache-ttl", type=float, default=30 * 24 * 60 * 60,
+                        help="The number of seconds a cached response stays valid.")
+    parser.add_argument("--cache-max-size", type=float, default=256,
+                        help="The maximum size of the cache in megabytes. The least recently used responses are "
+                             "evicted beyond it.")
+    parser.add_argument("--cache-bypass", action='store_true',
+                        help="When this is provided, cached responses are not read but fresh responses are stored. "
+                             "Implies --cache.")
+    parser.add_argument("--clear-cache", action='store_true',
+                        help="When this is provided, the cache is cleared before the request is executed. "
+                             "Implies --cache.")
+    parser.add_argument("--offline", action='store_true',
+                        help="When this is provided, resources are read from the local snapshot instead of the "
+                             "PokeAPI.")
+    parser.add_argument("--snapshot-dir", default="snapshot",
+                        help="The directory of the local snapshot, laid out like the API (e.g. pokemon/25.json).")
+    parser.add_argument("--seed", nargs='+', default=None, metavar="JSONFILE",
+                        help="JSON files of the selected mode, such as the ones in testjsons/, to add to the snapshot "
+                             "before the request is executed.")
+    parser.add_argument("--seed-mode", choices=SnapshotBuilder.MODES, default=None,
+                        help="The mode of the JSON files given with --seed. Defaults to the selected mode, and is "
+                             "required with the other modes, such as the reverse lookups.")
+    parser.add_argument("--metrics", choices=['summary', 'json', 'prometheus'], default=None,
+                        help="When this is provided, the time spent in every stage of the chain and other counters "
+                             "are reported at the end of the run in the given format.")
+    parser.add_argument("--metrics-file", default=None,
+                        help="The file the metrics are written to. They are written to stderr if it is not provided.")
+    parser.add_argument("--snapshot-modes", nargs='+', default=list(SnapshotBuilder.MODES),
+                        choices=SnapshotBuilder.MODES, help="The resources mirrored by the 'snapshot' mode.")
+    parser.add_argument("--crawl-concurrency", type=int, default=20,
+                        help="The maximum number of resources fetched at the same time by the 'snapshot' mode.")
+    parser.add_argument("--host", default="127.0.0.1", help="The host the 'serve' mode listens on.")
+    parser.add_argument("--port", type=int, default=8080, help="The port the 'serve' mode listens on.")
+    args = parser.parse_args()
+    args.cache = args.cache or args.cache_bypass or args.clear_cache
+    if args.seed and args.seed_mode is None:
+        if args.mode not in SnapshotBuilder.MODES:
+            parser.error(f"--seed needs --seed-mode to tell the mode of its JSON files with the '{args.mode}' mode.")
+        args.seed_mode = args.mode
+    if args.cache and args.offline:
+        parser.error("--cache, --cache-bypass and --clear-cache have no effect with --offline.")
+    mixed_modes = {mode.value for mode in PokedexMode if mode.is_reverse or mode is PokedexMode.BATCH}
+    if args.format in ("csv", "parquet") and args.mode in mixed_modes:
+        parser.error(f"--format {args.format} writes a table of one type of entity, so it cannot be used with the "
+                     f"'{args.mode}' mode. Use --format jsonl instead.")
+    if args.format == "parquet":
+        try:
+            ParquetWriter.check(args.output)
+        except ValueError as e:
+            parser.error(str(e))
+    return args
+
+
+def setup_request_commandline(args: argparse.Namespace) -> Request:
+    """
+    Creates a Request object from the command line arguments.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
 
+    Returns:
+        Request: An object containing user inputs for the PokeDex API request.
+    """
     try:
-        args = parser.parse_args()
         request = Request()
         request.poke_dex_mode = PokedexMode(args.mode.lower())
         request.data_input = [args.inputdata]
         request.input_file = args.inputfile
         request.expanded = args.expanded
         request.output_type = args.output
-        if request.input_file:
+        request.output_format = args.format
+        if request.input_file and not args.stream:
             with open(request.input_file) as file:
                 request.data_input = tuple(line.rstrip() for line in file)
         return request
@@ -48,13 +164,158 @@ def setup_request_commandline() -> Request:
         exit(-1)
 
 
+def setup_pokedex(args: argparse.Namespace) -> PokeDex:
+    """
+    Creates a PokeDex configured from the command line arguments.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        PokeDex: The PokeDex used to execute requests.
+    """
+    decoder = JSONDecoder(args.json_backend, prune_fields=not args.no_prune)
+    index = InvertedIndex(Snapshot(args.snapshot_dir), decoder=decoder)
+    if args.seed:
+        try:
+            Snapshot(args.snapshot_dir).seed(args.seed_mode, args.seed)
+            if args.seed_mode in InvertedIndex.MODES:
+                index.build()
+        except KeyError as e:
+            print(f"Cannot seed the snapshot.\nThe {args.seed_mode} JSON files have no field {e}.", file=sys.stderr)
+            exit(-1)
+        except (OSError, ValueError) as e:
+            print(f"Cannot seed the snapshot.\n{e}", file=sys.stderr)
+            exit(-1)
+    if args.offline:
+        return PokeDex(client=SnapshotClient(Snapshot(args.snapshot_dir), decoder=decoder), index=index,
+                       resolve_names=args.resolve_names, pipeline_workers=args.pipeline_workers)
+
+    cache = None
+    if args.cache:
+        cache = ResponseCache(args.cache_path, ttl=args.cache_ttl, max_size=int(args.cache_max_size * 1024 * 1024))
+        if args.clear_cache:
+            cache.clear()
+    scheduler = RequestScheduler(max_in_flight=args.max_in_flight or args.limit_per_host, rate=args.rate_limit, burst=args.burst)
+    retry_policy = RetryPolicy(max_attempts=args.retries, backoff=args.retry_backoff,
+                               max_backoff=args.retry_max_backoff, jitter=args.retry_jitter, timeout=args.timeout)
+    return PokeDex(limit_per_host=args.limit_per_host, keepalive_timeout=args.keepalive, cache=cache,
+                   cache_bypass=args.cache_bypass, scheduler=scheduler, retry_policy=retry_policy, decoder=decoder,
+                   index=index, resolve_names=args.resolve_names, pipeline_workers=args.pipeline_workers)
+
+
+def read_input_lines(input_file: str):
+    """
+    Lazily reads the inputs of an input file, one per line.
+
+    Args:
+        input_file (str): The path of the input file.
+
+    Yields:
+        str: The input on each line.
+    """
+    with open(input_file) as file:
+        for line in file:
+            yield line.rstrip()
+
+
+async def run_request(pokedex: PokeDex, request: Request, args: argparse.Namespace):
+    """
+    Executes a request, streaming the input file if requested, and closes the session of the PokeDex once it is done.
+
+    Args:
+        pokedex (PokeDex): The PokeDex used to execute the request.
+        request (Request): The request to execute.
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+    async with pokedex:
+        if args.stream and request.input_file:
+            await pokedex.execute_stream(request, read_input_lines(request.input_file), args.window_size)
+        else:
+            await pokedex.execute_request(request)
+    if args.metrics:
+        write_metrics(pokedex, args)
+
+
+def write_metrics(pokedex: PokeDex, args: argparse.Namespace):
+    """
+    Writes the metrics recorded by the PokeDex to the metrics file, or to stderr.
+
+    Args:
+        pokedex (PokeDex): The PokeDex whose metrics are written.
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+    report = pokedex.report_metrics(args.metrics)
+    if args.metrics_file:
+        with open(args.metrics_file, 'w') as file:
+            file.write(report)
+    else:
+        print(report, file=sys.stderr)
+
+
+async def build_snapshot(pokedex: PokeDex, args: argparse.Namespace):
+    """
+    Mirrors the PokeAPI into the local snapshot and rebuilds its inverted index, then prints the throughput of the
+    build.
+
+    Args:
+        pokedex (PokeDex): The PokeDex whose client is used to fetch resources.
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+    async with pokedex:
+        builder = SnapshotBuilder(pokedex.client, Snapshot(args.snapshot_dir), modes=args.snapshot_modes,
+                                  concurrency=args.crawl_concurrency)
+        stats = await builder.build()
+    try:
+        pokedex.index.build()
+    except ValueError as e:
+        print(e, file=sys.stderr)
+    print(f"Snapshot written to {args.snapshot_dir}: {stats['fetched']} fetched, {stats['skipped']} skipped, "
+          f"{stats['failed']} failed in {stats['seconds']:.1f}s ({stats['per_second']:.1f} resources/s)")
+
+
+async def serve(pokedex: PokeDex, args: argparse.Namespace):
+    """
+    Serves the PokeDex over HTTP until the process is interrupted, sharing its connections and caches between every
+    lookup.
+
+    Args:
+        pokedex (PokeDex): The PokeDex to serve.
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+    async with pokedex:
+        server = PokedexServer(pokedex)
+        url = await server.start(args.host, args.port)
+        print(f"Serving the Pokedex on {url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+
 def main():
     """
     Main function that executes a PokeDex API request based on user inputs from the command line.
     """
-    request = setup_request_commandline()
-    pokedex = PokeDex()
-    asyncio.run(pokedex.execute_request(request))
+    args = setup_commandline()
+    if args.mode == 'snapshot':
+        asyncio.run(build_snapshot(setup_pokedex(args), args))
+        return
+    if args.mode == 'serve':
+        try:
+            asyncio.run(serve(setup_pokedex(args), args))
+        except KeyboardInterrupt:
+            pass
+        return
+    request = setup_request_commandline(args)
+    pokedex = setup_pokedex(args)
+    if request.poke_dex_mode.is_reverse:
+        try:
+            pokedex.index.indexes
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            exit(-1)
+    asyncio.run(run_request(pokedex, request, args))
 
 
 if __name__ == '__main__':
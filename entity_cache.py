@@ -0,0 +1,100 @@
+from collections import OrderedDict
+
+
+class EntityCache:
+    """
+    An in-memory least recently used cache of populated entities.
+
+    Entities are stored under (mode, id) and can also be found through any number of (mode, alias) keys, such as
+    their name or the input that was used to look them up. Expanded Pokémon are stored under their own mode, see
+    `mode_of`, because they are rendered differently from plain Pokémon.
+
+    :param max_entries: The maximum number of entities kept in the cache.
+    """
+
+    def __init__(self, max_entries=2048):
+        """
+        Constructor for the EntityCache class.
+
+        :param max_entries: The maximum number of entities kept in the cache.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._aliases = {}
+        self._aliases_of = {}
+
+    @staticmethod
+    def mode_of(request):
+        """
+        Get the mode under which the entities of a request are cached.
+
+        :param request: The request the entities are created for.
+        :return: The mode of the request, suffixed with "-expanded" for expanded requests.
+        """
+        mode = request.poke_dex_mode.value
+        return f"{mode}-expanded" if request.expanded else mode
+
+    def get(self, mode, key):
+        """
+        Get a cached entity by its id or by one of its aliases, and mark it as recently used.
+
+        :param mode: The mode the entity is cached under.
+        :param key: The id or an alias of the entity.
+        :return: The cached entity, or None if it is not cached.
+        """
+        key = (mode, str(key))
+        key = self._aliases.get(key, key)
+        entity = self._entries.get(key)
+        if entity is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entity
+
+    def put(self, mode, entity, *aliases):
+        """
+        Cache a populated entity under its id, its name and the given aliases, evicting the least recently used
+        entity if the cache is full.
+
+        :param mode: The mode to cache the entity under.
+        :param entity: The populated entity.
+        :param aliases: Additional keys the entity can be found by.
+        """
+        if self.max_entries <= 0:
+            return
+        key = (mode, str(entity.ID))
+        self._entries[key] = entity
+        self._entries.move_to_end(key)
+        for alias in (entity.name, *aliases):
+            if alias is not None and str(alias) != key[1]:
+                self._aliases[(mode, str(alias))] = key
+                self._aliases_of.setdefault(key, set()).add((mode, str(alias)))
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            for alias in self._aliases_of.pop(evicted, ()):
+                if self._aliases.get(alias) == evicted:
+                    del self._aliases[alias]
+
+    def clear(self):
+        """
+        Remove every entity from the cache and reset the counters.
+        """
+        self._entries.clear()
+        self._aliases.clear()
+        self._aliases_of.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Get the counters of the cache.
+
+        :return: A dictionary with the number of hits, misses and cached entities.
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def __len__(self):
+        return len(self._entries)
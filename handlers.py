@@ -1,16 +1,20 @@
 import abc
 import asyncio
-import aiohttp
 import json
 from abc import ABC
 
 import requests
 
 from ability import Ability
+from entity_cache import EntityCache
+from inverted_index import LookupResult
+from metrics import Metrics
 from move import Move
-from pokemon import Pokemon
+from output_writer import FORMATS
+from pokedex_object import PokedexObject
+from pokemon import MoveLink, Pokemon, StatLink
 from stats import Stats
-from request import Request
+from request import Request, parse_flag
 import requests as pokeapi
 
 
@@ -18,9 +22,17 @@ class Handler(ABC):
     """
     An abstract base class for creating handlers that process requests in a chain.
 
+    Every handler records the wall time of its own work, the number of items it processed and the number of items
+    that failed in its `metrics`, under the name of its class.
+
+    A handler does its own work in `process`, and `handle` passes the request on down the chain afterwards, so a
+    Pipeline can also run the handlers of a chain as separate stages. `CONCURRENT` handlers wait on I/O and may process
+    several requests at the same time, while every other handler processes one request at a time, in order.
+
     :param next_handler: The next handler in the chain.
     :type next_handler: Handler or None
     """
+    CONCURRENT = False
 
     def __init__(self, next_handler=None):
         """
@@ -30,6 +42,41 @@ class Handler(ABC):
          :type next_handler: Handler or None
          """
         self._next_handler = next_handler
+        self.metrics = Metrics()
+
+    @property
+    def next_handler(self):
+        """
+        The next handler in the chain, or None if this is the last one.
+        """
+        return self._next_handler
+
+    @property
+    def stage_name(self):
+        """
+        The name this handler records its metrics under.
+        """
+        return type(self).__name__
+
+    def set_metrics(self, metrics):
+        """
+        Sets the metrics this handler records to, usually shared by every handler of a PokeDex.
+
+        :param metrics: The metrics to record to.
+        :type metrics: Metrics
+        """
+        self.metrics = metrics
+
+    def timed(self, items=0):
+        """
+        Times the work of this handler, excluding the handlers after it in the chain.
+
+        Usage: `with self.timed(len(request.data_input)): ...`
+
+        :param items: The number of items processed.
+        :return: A context manager recording the wall time of its block.
+        """
+        return self.metrics.stage(self.stage_name, items)
 
     def set_next_handler(self, next_handler):
         """
@@ -40,57 +87,194 @@ class Handler(ABC):
         """
         self._next_handler = next_handler
 
+    async def handle(self, request):
+        """
+        Handle the request with this handler, then pass it on to the next handler in the chain, if there is one.
+
+        :param request: The request to handle.
+        """
+        await self.process(request)
+        if self._next_handler is not None:
+            await self._next_handler.handle(request)
+
     @abc.abstractmethod
-    def handle(self, request):
+    async def process(self, request):
         """
-        Sets the next handler in the chain.
+        Do the work of this handler on the request, without passing it on.
 
-        :param next_handler: The next handler in the chain.
-        :type next_handler: Handler
+        :param request: The request to process.
         """
         pass
 
 
+class NormaliseInputHandler(Handler):
+    """
+    A handler class for normalising the inputs of a request before anything else handles them.
+
+    Every input is lowercased, stripped and its inner whitespace replaced by hyphens, as in the names of the PokeAPI,
+    and ids lose their leading zeros, so `Raichu`, ` raichu ` and `RAICHU` or `25` and `025` become the same input.
+    Blank inputs are dropped and duplicates are collapsed into one, while the position of every original input is kept
+    in `request.positions` so the results are output in the original order, and the text every input was given as is
+    kept in `request.input_text` so messages name inputs as they were typed.
+    """
+
+    async def process(self, request):
+        """
+        Handle the request by replacing its inputs with the unique normalised inputs.
+
+        :param request: The request object containing input data.
+        """
+        with self.timed(len(request.data_input)):
+            data_input, positions, input_text, seen = [], [], [], {}
+            for single_input in request.data_input:
+                key = self.normalise(single_input)
+                if not key:
+                    continue
+                if key not in seen:
+                    seen[key] = len(data_input)
+                    data_input.append(key)
+                    input_text.append(str(single_input).strip())
+                positions.append(seen[key])
+            request.data_input = data_input
+            request.positions = positions
+            request.input_text = input_text
+        self.metrics.increment("duplicate_inputs", len(positions) - len(data_input))
+
+    @staticmethod
+    def normalise(single_input):
+        """
+        Normalise a single input.
+
+        :param single_input: The input, a name or an id.
+        :return: The normalised input, or an empty string if the input is blank.
+        """
+        if single_input is None:
+            return ""
+        key = "-".join(str(single_input).lower().split())
+        return str(int(key)) if key.isdecimal() else key
+
+
+class ResolveNamesHandler(Handler):
+    """
+    A handler class for resolving the inputs of a request against a local index of names before anything is fetched.
+
+    Known names are replaced by their id, and inputs that are not known names are rejected with the most similar known
+    name as a suggestion, so they never reach the PokeAPI. Without an index every input is passed on unchanged.
+
+    :param names: The index of names, or None to resolve nothing.
+    :type names: NameIndex or None
+    :param next_handler: The next handler in the chain.
+    :type next_handler: Handler or None
+    """
+    CONCURRENT = True
+
+    def __init__(self, names=None, next_handler=None):
+        """
+        Constructor for the ResolveNamesHandler class.
+
+        :param names: The index of names, or None to resolve nothing.
+        :type names: NameIndex or None
+        :param next_handler: The next handler in the chain.
+        :type next_handler: Handler or None
+        """
+        super().__init__(next_handler)
+        self._names = names
+
+    async def process(self, request):
+        """
+        Handle the request by resolving every input to an id, or rejecting it.
+
+        :param request: The request object containing input data and mode.
+        """
+        mode = request.poke_dex_mode.value
+        if self._names is not None and await self._names.load(mode):
+            with self.timed(len(request.data_input)):
+                data_input = list(request.data_input)
+                for index, single_input in enumerate(data_input):
+                    resolved = self._names.resolve(mode, single_input)
+                    if resolved is None:
+                        request.rejected[index] = self._names.suggest(mode, single_input)
+                    else:
+                        data_input[index] = resolved
+                request.data_input = data_input
+            self.metrics.add_errors(self.stage_name, len(request.rejected))
+
+
 class GetRequestsHandler(Handler):
     """
     A handler class for getting data from the PokeAPI.
+
+    Inputs whose entity is already in the entity cache are not fetched; the cached entity is passed down the chain in
+    place of its JSON.
+
+    :param client: The shared client used to make requests to the PokeAPI.
+    :type client: PokeAPIClient
+    :param entities: The cache of populated entities.
+    :type entities: EntityCache
+    :param next_handler: The next handler in the chain.
+    :type next_handler: Handler or None
     """
-    API_URL = "https://pokeapi.co/api/v2/"
+    CONCURRENT = True
 
-    async def handle(self, request):
+    def __init__(self, client, entities, next_handler=None):
         """
-        Handle the request by fetching data from the PokeAPI for each input value.
+        Constructor for the GetRequestsHandler class.
 
-        :param request: The request object containing input data.
+        :param client: The shared client used to make requests to the PokeAPI.
+        :type client: PokeAPIClient
+        :param entities: The cache of populated entities.
+        :type entities: EntityCache
+        :param next_handler: The next handler in the chain.
+        :type next_handler: Handler or None
         """
-        tasks = [self.get_request(request.poke_dex_mode.value, single_input) for single_input in request.data_input]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        request.pokemon_info.extend([result for result in results])
-        await self._next_handler.handle(request)
+        super().__init__(next_handler)
+        self._client = client
+        self._entities = entities
 
-    @classmethod
-    async def get_request(cls, mode, single_input):
+    async def process(self, request):
         """
-        Make an asynchronous request to the PokeAPI for a single input value.
+        Handle the request by fetching data from the PokeAPI for each input value that is not cached. A request that
+        failed with an exception is treated like an invalid input, and inputs rejected earlier in the chain are not
+        fetched at all. Only the requests that failed are counted as errors of this handler, as the rejected inputs are
+        counted by the handler that rejected them.
+
+        :param request: The request object containing input data.
+        """
+        with self.timed(len(request.data_input)):
+            mode = EntityCache.mode_of(request)
+            cached = [None if index in request.rejected else self._entities.get(mode, single_input)
+                      for index, single_input in enumerate(request.data_input)]
+            pending = [entity is None and index not in request.rejected for index, entity in enumerate(cached)]
+            tasks = [self.get_request(request.poke_dex_mode.value, single_input)
+                     for single_input, fetch in zip(request.data_input, pending) if fetch]
+            fetched = [None if isinstance(result, BaseException) else result
+                       for result in await asyncio.gather(*tasks, return_exceptions=True)]
+            results = iter(fetched)
+            request.pokemon_info.extend([next(results) if fetch else entity for entity, fetch in zip(cached, pending)])
+        self.metrics.add_errors(self.stage_name, fetched.count(None))
+
+    async def get_request(self, mode, single_input):
+        """
+        Make an asynchronous request to the PokeAPI for a single input value using the shared client.
 
         :param mode: The API mode to use for the request.
         :param single_input: The input value to request data for.
         :return: The JSON response for the request, or None if an error occurred.
         """
-        end_point = f"{mode}/{single_input}"
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(f"{cls.API_URL}{end_point}") as response:
-                    response.raise_for_status()
-                    content = await response.read()
-                    return json.loads(content.decode('utf-8'))
-            except aiohttp.ClientResponseError as e:
-                return None
+        return await self._client.get_request(mode, single_input)
 
 
 class CreateEntityHandler(Handler):
     """
-    A handler class for creating entities based on the request mode.
+    A handler class for creating entities from the fetched JSON, based on the request mode.
+
+    Every mode of `MAP` has a factory, its `create_<mode>` method, that builds an entity straight from its JSON in a
+    single synchronous pass over the request. Moves, abilities and stats are created fully populated, while Pokémon
+    are created empty, as their stats, abilities and moves are linked by the Pokémon handlers after this one. Entities
+    taken from the cache are passed on as they are.
+
+    :param next_handler: The next handler in the chain.
+    :type next_handler: Handler or None
     """
     MAP = {
         "pokemon": Pokemon,
@@ -99,121 +283,252 @@ class CreateEntityHandler(Handler):
         "stat": Stats
     }
 
-    async def handle(self, request):
+    def __init__(self, next_handler=None):
+        """
+        Constructor for the CreateEntityHandler class.
+
+        :param next_handler: The next handler in the chain.
+        :type next_handler: Handler or None
+        """
+        super().__init__(next_handler)
+        self.factories = {mode: self.factory(mode) for mode in self.MAP}
+
+    async def process(self, request):
         """
         Handle the request by creating entities based on the mode.
 
-        :param request: The request object containing input data and mode.
+        :param request: The request object containing the fetched info and mode.
+        """
+        with self.timed(len(request.data_input)):
+            mode, create_entity = request.poke_dex_mode.value, self.create_entity
+            request.result = [create_entity(mode, info) for info in request.pokemon_info]
+
+    @classmethod
+    def factory(cls, mode):
+        """
+        Get the factory of a mode, which builds an entity from the JSON response of the mode.
+
+        :param mode: The mode to get the factory of, one of `MAP`.
+        :return: The `create_<mode>` method of the mode.
+        :raises ValueError: If the mode has no entity.
         """
-        # print(request.pokemon_info)
-        tasks = [asyncio.create_task(self.create_entity(None if info is None else request.poke_dex_mode.value)) for info
-                 in request.pokemon_info]
-        request.result = await asyncio.gather(*tasks)
-        await self._next_handler.handle(request)
+        if mode not in cls.MAP:
+            raise ValueError(f"There is no entity for the mode '{mode}'.")
+        return getattr(cls, f"create_{mode}")
 
-    async def create_entity(self, mode):
+    def create_entity(self, mode, info=None):
         """
         Create an entity based on the given mode.
 
         :param mode: The mode to create an entity for.
-        :return: A new entity object or None if the mode is not valid.
+        :param info: The fetched info of the entity. If it is an entity taken from the cache it is returned as is.
+        :return: A new entity object or None if there is no info.
         """
-        if mode is None:
+        if info is None:
             return None
-        return self.MAP[mode]()
+        if isinstance(info, PokedexObject):
+            return info
+        return self.factories[mode](info)
 
+    @staticmethod
+    def create_pokemon(response):
+        """
+        Create an empty Pokemon entity, populated by the Pokémon handlers from the JSON response of the pokemon
+        endpoint.
 
-class PopulatePokemonHandler(Handler):
-    """
-    A handler class for populating Pokemon entities with data from the PokeAPI.
-    """
+        :param response: The JSON response of the Pokémon.
+        :return: An empty Pokemon object.
+        """
+        return Pokemon()
 
-    async def handle(self, request: Request):
+    @staticmethod
+    def create_stat(response):
         """
-        Handle the request by populating the Pokemon entities with data.
+        Create a Stats entity from the JSON response of the stat endpoint.
 
-        :param request: The request object containing input data and the list of Pokemon entities.
+        :param response: The JSON response of the stat.
+        :return: A populated Stats object.
+        """
+        return Stats(name=response["name"], ID=response["id"], is_battle=response["is_battle_only"],
+                     move_damage_class=response["move_damage_class"])
+
+    @staticmethod
+    def create_ability(response):
+        """
+        Create an Ability entity from the JSON response of the ability endpoint.
+
+        :param response: The JSON response of the ability.
+        :return: A populated Ability object.
+        """
+        return Ability(name=response["name"], id=response["id"], generation=response["generation"]['name'],
+                       effect="".join([effect_entry["effect"] for effect_entry in response["effect_entries"]
+                                       if effect_entry["language"]["name"] == "en"]),
+                       pokemon=", ".join([pokemon['pokemon']['name'] for pokemon in response["pokemon"]]))
+
+    @staticmethod
+    def create_move(response):
+        """
+        Create a Move entity from the JSON response of the move endpoint.
+
+        :param response: The JSON response of the move.
+        :return: A populated Move object.
         """
-        for index, entity in enumerate(request.result):
-            if entity is None:
-                request.result[index] = f"\n\n{request.data_input[index]} is not valid. Skipping this request.\n"
-            else:
-                entity.name = request.pokemon_info[index]["name"]
-                entity.ID = request.pokemon_info[index]["id"]
-                entity.height = request.pokemon_info[index]["height"]
-                entity.weight = request.pokemon_info[index]["weight"]
-                entity.stats = "".join(
-                    [f'{(stat["stat"]["name"], stat["base_stat"])}\n' for stat in request.pokemon_info[index]["stats"]])
-                entity.types = ", ".join(
-                    [specific_type["type"]["name"] for specific_type in request.pokemon_info[index]["types"]])
-                entity.abilities = "\n\n".join(
-                    [ability["ability"]["name"] for ability in request.pokemon_info[index]["abilities"]])
-                entity.moves = "".join([
-                    f'(\'Move name: {move["move"]["name"]}\','
-                    f' \'Level acquired: {move["version_group_details"][0]["level_learned_at"]}'
-                    f'\')\n\n'
-                    for move in request.pokemon_info[index]["moves"]])
-        await self._next_handler.handle(request)
-
-
-class PopulateAbilityHandler(Handler):
+        return Move(name=response["name"], ID=response["id"], generation=response['generation']['name'],
+                    accuracy=response['accuracy'], pp=response['pp'], power=response['power'],
+                    type=response["type"]["name"], damage_class=response['damage_class']["name"],
+                    effect=''.join([effect_entry["short_effect"] for effect_entry in response["effect_entries"]
+                                    if len(effect_entry) > 0 and effect_entry["language"]["name"] == "en"]))
+
+
+class PopulateEntityHandler(Handler):
     """
-    A handler class for populating Ability entities with data from the PokeAPI.
+    A base class for handlers that populate entities, sharing the cache of populated entities.
+
+    :param entities: The cache of populated entities.
+    :type entities: EntityCache
+    :param next_handler: The next handler in the chain.
+    :type next_handler: Handler or None
     """
 
-    async def handle(self, request):
+    def __init__(self, entities, next_handler=None):
+        """
+        Constructor for the PopulateEntityHandler class.
+
+        :param entities: The cache of populated entities.
+        :type entities: EntityCache
+        :param next_handler: The next handler in the chain.
+        :type next_handler: Handler or None
+        """
+        super().__init__(next_handler)
+        self._entities = entities
+
+    @staticmethod
+    def is_cached(request, index):
+        """
+        Check whether the entity at an index was taken from the cache and is therefore already populated.
+
+        :param request: The request object containing the fetched info and the list of entities.
+        :param index: The index of the entity.
+        :return: True if the entity is already populated.
+        """
+        return request.result[index] is request.pokemon_info[index]
+
+    @staticmethod
+    def invalid(request, index, separator="\n"):
+        """
+        Describe an input that could not be populated, suggesting a correction if one was found.
+
+        :param request: The request object containing input data and the rejected inputs.
+        :param index: The index of the input.
+        :param separator: The text written before the description.
+        :return: The description of the invalid input.
+        """
+        suggestion = request.rejected.get(index)
+        hint = f" Did you mean {suggestion}?" if suggestion else ""
+        return f"{separator}{request.text_of(index)} is not valid.{hint} Skipping this request.\n"
+
+    def cache_entity(self, request, index):
+        """
+        Cache a freshly populated entity under its id, its name and the input it was requested by.
+
+        :param request: The request object containing input data and the list of entities.
+        :param index: The index of the entity.
         """
-        Handle the request by populating the Ability entities with data.
+        self._entities.put(EntityCache.mode_of(request), request.result[index], request.data_input[index])
 
-        :param request: The request object containing input data and the list of Ability entities.
+    async def process(self, request):
         """
-        for index, entity in enumerate(request.result):
-            if entity is None:
-                request.result[index] = f"\n{request.data_input[index]} is not valid. Skipping this request.\n"
-            else:
-                entity.name = request.pokemon_info[index]["name"]
-                entity.ID = request.pokemon_info[index]["id"]
-                entity.generation = request.pokemon_info[index]["generation"]['name']
-                entity.effect = "".join(
-                    [effect_entry["effect"] for effect_entry in request.pokemon_info[index]["effect_entries"] if
-                     effect_entry["language"]["name"] == "en"])
-                entity.pokemon = ", ".join(
-                    [f"{pokemon['pokemon']['name']}" for pokemon in request.pokemon_info[index]["pokemon"]])
+        Handle the request by describing every invalid input and caching every entity created from fetched JSON, for
+        entities that CreateEntityHandler creates fully populated.
 
-        await self._next_handler.handle(request)
+        :param request: The request object containing input data and the list of entities.
+        """
+        with self.timed(len(request.data_input)):
+            for index, entity in enumerate(request.result):
+                if entity is None:
+                    request.result[index] = self.invalid(request, index)
+                elif not self.is_cached(request, index):
+                    self.cache_entity(request, index)
 
 
-class PopulateMovesHandler(Handler):
+class PopulatePokemonHandler(PopulateEntityHandler):
     """
-    A handler class for populating Move entities with data from the PokeAPI.
+    A handler class for populating Pokemon entities with data from the PokeAPI.
+
+    The stats, abilities and moves of every Pokémon are linked to entities that only hold their name. These entities
+    are shared by every Pokémon that refers to them.
+
+    :param entities: The cache of populated entities.
+    :type entities: EntityCache
+    :param next_handler: The next handler in the chain.
+    :type next_handler: Handler or None
     """
 
-    async def handle(self, request):
+    def __init__(self, entities, next_handler=None):
         """
-        Handle the request by populating the Move entities with data.
+        Constructor for the PopulatePokemonHandler class.
 
-        :param request: The request object containing input data and the list of Move entities.
+        :param entities: The cache of populated entities.
+        :type entities: EntityCache
+        :param next_handler: The next handler in the chain.
+        :type next_handler: Handler or None
         """
-        for index, entity in enumerate(request.result):
-            if entity is None:
-                request.result[index] = f"\n{request.data_input[index]} is not valid. Skipping this request.\n"
-            else:
-                entity.name = request.pokemon_info[index]["name"]
-                entity.ID = request.pokemon_info[index]["id"]
-                entity.generation = request.pokemon_info[index]["generation"]["name"]
-                entity.accuracy = request.pokemon_info[index]["accuracy"]
-                entity.pp = request.pokemon_info[index]["pp"]
-                entity.power = request.pokemon_info[index]["power"]
-                entity.type = request.pokemon_info[index]["type"]["name"]
-                entity.damage_class = request.pokemon_info[index]["damage_class"]["name"]
-                entity.effect = "".join([effect_entry["short_effect"]
-                                         for effect_entry in request.pokemon_info[index]["effect_entries"]
-                                         if len(effect_entry) > 0 and effect_entry["language"]["name"] == "en"])
+        super().__init__(entities, next_handler)
+        self._references = {}
+
+    async def process(self, request: Request):
+        """
+        Handle the request by populating the Pokemon entities with data.
+
+        :param request: The request object containing input data and the list of Pokemon entities.
+        """
+        with self.timed(len(request.data_input)):
+            for index, entity in enumerate(request.result):
+                if entity is None:
+                    request.result[index] = self.invalid(request, index, "\n\n")
+                elif not self.is_cached(request, index):
+                    info = request.pokemon_info[index]
+                    entity.name = info["name"]
+                    entity.ID = info["id"]
+                    entity.height = info["height"]
+                    entity.weight = info["weight"]
+                    entity.stats = [StatLink(self.reference("stat", stat["stat"]["name"]), stat["base_stat"])
+                                    for stat in info["stats"]]
+                    entity.types = [specific_type["type"]["name"] for specific_type in info["types"]]
+                    entity.abilities = [self.reference("ability", ability["ability"]["name"])
+                                        for ability in info["abilities"]]
+                    entity.moves = [MoveLink(self.reference("move", move["move"]["name"]),
+                                             move["version_group_details"][0]["level_learned_at"])
+                                    for move in info["moves"]]
+                    self.cache_entity(request, index)
+
+    def reference(self, mode, name):
+        """
+        Get the entity a Pokémon refers to by name, creating it the first time the name is seen.
+
+        :param mode: The mode of the referenced entity, "stat", "ability" or "move".
+        :param name: The name of the referenced entity.
+        :return: The shared entity, holding only its name.
+        """
+        key = (mode, name)
+        if key not in self._references:
+            self._references[key] = CreateEntityHandler.MAP[mode](name=name)
+        return self._references[key]
+
+
+class PopulateAbilityHandler(PopulateEntityHandler):
+    """
+    A handler class for finishing Ability entities, which CreateEntityHandler creates populated from the PokeAPI.
+    """
+
 
-        await self._next_handler.handle(request)
+class PopulateMovesHandler(PopulateEntityHandler):
+    """
+    A handler class for finishing Move entities, which CreateEntityHandler creates populated from the PokeAPI.
+    """
 
 
-class PopulateExpandedPokemonHandler(Handler):
+class PopulateExpandedPokemonHandler(PopulateEntityHandler):
     """
        A handler to populate Pokemon entities with additional information from API requests.
 
@@ -221,10 +536,12 @@ class PopulateExpandedPokemonHandler(Handler):
        -----------
        _next_handler: Handler
            The next handler in the chain of responsibility pattern.
+       _max_concurrency: int
+           The maximum number of sub-resource requests that are in flight at the same time.
 
        Methods:
        --------
-       async def handle(self, request: Request):
+       async def process(self, request: Request):
            Populates the Pokemon entities in the request with additional information from API requests.
            Parameters:
                request (Request): The request object to handle.
@@ -233,13 +550,34 @@ class PopulateExpandedPokemonHandler(Handler):
            Returns:
                None.
        """
+    CONCURRENT = True
+
+    def __init__(self, client, entities, max_concurrency=20, next_handler=None):
+        """
+        Constructor for the PopulateExpandedPokemonHandler class.
+
+        :param client: The shared client used to look up the stats, abilities and moves of each Pokémon.
+        :type client: PokeAPIClient
+        :param entities: The cache of populated entities, shared with the stats, abilities and moves.
+        :type entities: EntityCache
+        :param max_concurrency: The maximum number of sub-resource requests that are in flight at the same time.
+        :type max_concurrency: int
+        :param next_handler: The next handler in the chain.
+        :type next_handler: Handler or None
+        """
+        super().__init__(entities, next_handler)
+        self._client = client
+        self._max_concurrency = max_concurrency
 
-    async def handle(self, request: Request):
+    async def process(self, request: Request):
         """
         Updates the `request.result` list with information obtained from external API requests.
 
-        For each entity in `request.result`, this function makes several API requests to obtain information about the
-        corresponding Pokémon's abilities, moves, stats, and types. It then updates the `entity` object with this information.
+        The stats, abilities and moves referenced by every Pokémon in the batch are collected first and those that
+        are not in the entity cache are requested concurrently, bounded by `max_concurrency`. Each entity is then
+        assembled from the sub-resources, so the time spent scales with network concurrency instead of with the
+        number of moves. Sub-resources that could not be fetched are listed in the `unfetched` field of the Pokémon,
+        which is then not cached, so that the next request tries them again.
 
         Args:
             request (Request): An instance of the Request class containing information about the API requests to be made.
@@ -250,89 +588,325 @@ class PopulateExpandedPokemonHandler(Handler):
         Raises:
             None
         """
-        for index, entity in enumerate(request.result):
-            if entity is None:
-                request.result[index] = f"\n{request.data_input[index]} is not valid. Skipping this request.\n"
-                continue
-
-            entity.name = request.pokemon_info[index]["name"]
-            entity.ID = request.pokemon_info[index]["id"]
-            entity.height = request.pokemon_info[index]["height"]
-            entity.weight = request.pokemon_info[index]["weight"]
-            # entity.stats = "".join(
-            #     [f'{(stat["stat"]["name"], stat["base_stat"])}\n' for stat in request.pokemon_info[index]["stats"]])
-            entity.stats = ""
-            stats_list = request.pokemon_info[index]["stats"]
-            for stat in stats_list:
-                inner_response = GetRequestsHandler.get_request("stat", stat["stat"]['name'])
-                inner_response = await asyncio.gather(inner_response, return_exceptions=True)
-                inner_response = inner_response[0]
-                new_stat = Stats()
-                new_stat.name = inner_response["name"]
-                new_stat.ID = inner_response["id"]
-                new_stat.is_battle = inner_response["is_battle_only"]
-                new_stat.move_damage_class = inner_response["move_damage_class"]
-                entity.stats += f"{new_stat}"
-
-            entity.types = ", ".join(
-                [specific_type["type"]["name"] for specific_type in request.pokemon_info[index]["types"]])
-
-            ability_list = request.pokemon_info[index]['abilities']
-            entity.abilities = ''
-            for ability in ability_list:
-                inner_response = GetRequestsHandler.get_request("ability", ability["ability"]['name'])
-                inner_response = await asyncio.gather(inner_response, return_exceptions=True)
-                inner_response = inner_response[0]
-                new_ability = Ability()
-                new_ability.name = inner_response["name"]
-                new_ability.ID = inner_response["id"]
-                new_ability.generation = inner_response["generation"]['name']
-                new_ability.pokemon = ", ".join(
-                    [f"{pokemon['pokemon']['name']}" for pokemon in inner_response["pokemon"]])
-                new_ability.effect = "".join(
-                    [effect_entry["effect"] for effect_entry in inner_response["effect_entries"] if
-                     effect_entry["language"]["name"] == "en"])
-                entity.abilities += f"{new_ability}"
-
-            moves_list = request.pokemon_info[index]['moves']
-            entity.moves = ''
-            for move in moves_list:
-                inner_response = GetRequestsHandler.get_request('move', move["move"]["name"])
-                inner_response = await asyncio.gather(inner_response, return_exceptions=True)
-                inner_response = inner_response[0]
-                new_move = Move()
-                new_move.name = inner_response["name"]
-                new_move.ID = inner_response["id"]
-                new_move.generation = inner_response['generation']['name']
-                new_move.accuracy = inner_response['accuracy']
-                new_move.pp = inner_response['pp']
-                new_move.power = inner_response['power']
-                new_move.type = inner_response["type"]["name"]
-                new_move.damage_class = inner_response['damage_class']["name"]
-                new_move.effect = ''.join([effect_entry["short_effect"]
-                                           for effect_entry in inner_response["effect_entries"]
-                                           if len(effect_entry) > 0 and effect_entry["language"]["name"] == "en"])
-                entity.moves += f"{new_move}"
-        await self._next_handler.handle(request)
+        with self.timed(len(request.data_input)):
+            lookups = {}
+            for index, entity in enumerate(request.result):
+                if entity is not None and not self.is_cached(request, index):
+                    for key in self.sub_resources(request.pokemon_info[index]):
+                        if key not in lookups:
+                            lookups[key] = self._entities.get(*key)
+
+            semaphore = asyncio.Semaphore(self._max_concurrency)
+            missing = [key for key, sub_entity in lookups.items() if sub_entity is None]
+            responses = await asyncio.gather(
+                *[self._bounded_get_request(semaphore, mode, name) for mode, name in missing], return_exceptions=True)
+            for (mode, name), response in zip(missing, responses):
+                if isinstance(response, dict):
+                    lookups[(mode, name)] = CreateEntityHandler.factory(mode)(response)
+                    self._entities.put(mode, lookups[(mode, name)])
+            self.metrics.add_errors(self.stage_name, sum(sub_entity is None for sub_entity in lookups.values()))
+
+            for index, entity in enumerate(request.result):
+                if entity is None:
+                    request.result[index] = self.invalid(request, index)
+                    continue
+                if self.is_cached(request, index):
+                    continue
+
+                info = request.pokemon_info[index]
+                entity.name = info["name"]
+                entity.ID = info["id"]
+                entity.height = info["height"]
+                entity.weight = info["weight"]
+                entity.expanded = True
+                entity.stats = [StatLink(lookups[("stat", stat["stat"]["name"])], stat["base_stat"])
+                                for stat in info["stats"] if lookups[("stat", stat["stat"]["name"])] is not None]
+                entity.types = [specific_type["type"]["name"] for specific_type in info["types"]]
+                entity.abilities = [lookups[key] for key in self._keys("ability", "ability", info["abilities"])
+                                    if lookups[key] is not None]
+                entity.moves = [MoveLink(lookups[("move", move["move"]["name"])],
+                                         move["version_group_details"][0]["level_learned_at"])
+                                for move in info["moves"] if lookups[("move", move["move"]["name"])] is not None]
+                entity.unfetched = tuple(dict.fromkeys(f"{mode} {name}" for mode, name in self.sub_resources(info)
+                                                       if lookups[(mode, name)] is None))
+                if not entity.unfetched:
+                    self.cache_entity(request, index)
+
+    async def _bounded_get_request(self, semaphore, mode, name):
+        """
+        Request a single sub-resource once a slot of the semaphore is free.
+
+        :param semaphore: The semaphore bounding the number of requests in flight.
+        :param mode: The API mode to use for the request.
+        :param name: The name of the sub-resource.
+        :return: The JSON response for the request, or None if an error occurred.
+        """
+        async with semaphore:
+            return await self._client.get_request(mode, name)
+
+    @classmethod
+    def sub_resources(cls, info):
+        """
+        List the stats, abilities and moves referenced by the JSON of a Pokémon.
+
+        :param info: The JSON response of a Pokémon.
+        :return: A list of (mode, name) keys, one for every sub-resource.
+        """
+        return [*cls._keys("stat", "stat", info["stats"]),
+                *cls._keys("ability", "ability", info["abilities"]),
+                *cls._keys("move", "move", info["moves"])]
+
+    @staticmethod
+    def _keys(mode, field, entries):
+        """
+        Build the (mode, name) keys of a list of named references.
+
+        :param mode: The API mode of the referenced resources.
+        :param field: The field of each entry that holds the named reference.
+        :param entries: The entries of the Pokémon JSON to build keys for.
+        :return: A list of (mode, name) keys.
+        """
+        return [(mode, entry[field]["name"]) for entry in entries]
+
+
+class ReverseLookupHandler(Handler):
+    """
+    A handler class for answering reverse lookups, such as the Pokémon that learn a move, from an inverted index
+    instead of the PokeAPI.
+
+    :param index: The inverted index to look up.
+    :type index: InvertedIndex
+    :param next_handler: The next handler in the chain.
+    :type next_handler: Handler or None
+    """
+    LOOKUPS = {
+        "pokemon-by-move": (("move", "Pokemon learning"),),
+        "pokemon-by-type": (("type", "Pokemon of type"),),
+        "pokemon-by-ability": (("ability", "Pokemon with ability"),),
+        "generation": (("move-generation", "Moves introduced in"), ("ability-generation", "Abilities introduced in")),
+    }
+
+    def __init__(self, index, next_handler=None):
+        """
+        Constructor for the ReverseLookupHandler class.
+
+        :param index: The inverted index to look up.
+        :type index: InvertedIndex
+        :param next_handler: The next handler in the chain.
+        :type next_handler: Handler or None
+        """
+        super().__init__(next_handler)
+        self._index = index
+
+    async def process(self, request):
+        """
+        Handle the request by looking up every input in the index of the mode of the request. If there is no snapshot
+        to build the index from, every input is answered with an error saying so.
+
+        :param request: The request object containing input data and mode.
+        """
+        with self.timed(len(request.data_input)):
+            try:
+                self._index.indexes
+            except ValueError as e:
+                request.result = [f"\n{e}\n" for _ in request.data_input]
+                self.metrics.add_errors(self.stage_name, len(request.result))
+                return
+            mode = request.poke_dex_mode.value
+            request.result = [self.lookup(mode, single_input, request.text_of(index))
+                              for index, single_input in enumerate(request.data_input)]
+        self.metrics.add_errors(self.stage_name, sum(isinstance(result, str) for result in request.result))
+
+    def lookup(self, mode, single_input, text=None):
+        """
+        Look up a single input.
+
+        :param mode: The reverse lookup mode, one of `LOOKUPS`.
+        :param single_input: The name of the move, type, ability or generation.
+        :param text: The text the input was given as, used to name it if it is not valid. Defaults to the input.
+        :return: A LookupResult holding the names found, or a message saying the input is not valid.
+        """
+        key = str(single_input).strip().lower()
+        sections = [(kind, title, names) for kind, title in self.LOOKUPS[mode]
+                    if (names := self._index.lookup(kind, key)) is not None]
+        if not sections:
+            return f"\n{single_input if text is None else text} is not valid. Skipping this request.\n"
+        return LookupResult(mode, key, sections)
+
+
+class RouteHandler(Handler):
+    """
+    A handler class for batches mixing Pokémon, moves, abilities and reverse lookups, routing every item to the chain
+    of its mode within the same run.
+
+    Every item is either a line such as `pokemon:pikachu` or `move:tackle`, or a JSON object such as
+    `{"mode": "pokemon", "input": "pikachu", "expanded": true}`. Items of the same chain are sent down it together as
+    one request, every chain runs concurrently with the same client and caches, and the results are put back in the
+    order of the items.
+
+    :param routes: A dictionary mapping every route, a mode or "pokemon-expanded", to the first handler of its chain.
+    :type routes: dict
+    :param next_handler: The next handler in the chain.
+    :type next_handler: Handler or None
+    """
+    CONCURRENT = True
+
+    def __init__(self, routes, next_handler=None):
+        """
+        Constructor for the RouteHandler class.
+
+        :param routes: A dictionary mapping every route, a mode or "pokemon-expanded", to the first handler of its
+                       chain.
+        :type routes: dict
+        :param next_handler: The next handler in the chain.
+        :type next_handler: Handler or None
+        """
+        super().__init__(next_handler)
+        self._routes = routes
+
+    async def process(self, request):
+        """
+        Handle the request by splitting its items by route, handling every part through the chain of its route and
+        collecting the results in the order of the items. Blank items are dropped.
+
+        :param request: The request object containing the items as input data.
+        """
+        with self.timed(len(request.data_input)):
+            parts, positions, invalid = {}, [], {}
+            for item in request.data_input:
+                if item is None or not str(item).strip():
+                    continue
+                parsed = self.parse(item, request.expanded)
+                if parsed is None:
+                    invalid[len(positions)] = f"\n{str(item).strip()} is not valid. Skipping this request.\n"
+                    positions.append(None)
+                    continue
+                route, single_input = parsed
+                if route not in parts:
+                    parts[route] = request.window([])
+                    parts[route].poke_dex_mode = type(request.poke_dex_mode)(route.removesuffix("-expanded"))
+                    parts[route].expanded = route.endswith("-expanded")
+                    parts[route].output_type = []
+                positions.append((route, len(parts[route].data_input)))
+                parts[route].data_input.append(single_input)
+
+            await asyncio.gather(*[self._routes[route].handle(part) for route, part in parts.items()])
+            request.result = [invalid[index] if position is None else parts[position[0]].output_type[position[1]]
+                              for index, position in enumerate(positions)]
+        self.metrics.add_errors(self.stage_name, len(invalid))
+
+    def parse(self, item, expanded=False):
+        """
+        Parse a single item of a batch.
+
+        :param item: The item, a `mode:input` line or a JSON object with a mode, an input and optionally expanded.
+        :param expanded: Whether Pokémon items are expanded unless the item says otherwise.
+        :return: A tuple of the route and the input, or None if the item is malformed, its mode is unknown or its
+                 expanded is not a boolean, as parsed by `parse_flag`.
+        """
+        item = str(item).strip()
+        if item.startswith("{"):
+            try:
+                fields = json.loads(item)
+                mode, single_input = str(fields["mode"]).strip().lower(), fields["input"]
+                expanded = parse_flag(fields["expanded"]) if "expanded" in fields else expanded
+            except (ValueError, KeyError, TypeError):
+                return None
+        else:
+            mode, _, single_input = item.partition(":")
+            mode = mode.strip().lower()
+        if single_input is None or not str(single_input).strip():
+            return None
+        route = f"{mode}-expanded" if mode == "pokemon" and expanded else mode
+        return (route, single_input) if route in self._routes else None
 
 
 class OutputHandler(Handler):
     """
-    A handler class for outputting the results of the requests, either to a file or to the console.
+    A handler class for outputting the results of requests, either to a file, to the console or into a list.
+
+    Results are written by an OutputWriter chosen by the output_format of the request: the text of every entity, or
+    its fields as JSON Lines, CSV or Parquet. They are rendered in chunks on a pool of worker threads, so neither
+    rendering nor writing blocks the event loop. The write of a request is only awaited when the next request reaches
+    this handler, or by `flush`, so the output of one window of a stream overlaps with fetching the next one, while at
+    most one write is pending at any time. The writer stays open across the windows of a stream until `flush`.
+
+    :param executor: The pool of workers results are rendered and written on, or None for the default of the loop.
+    :type executor: concurrent.futures.Executor or None
+    :param next_handler: The next handler in the chain.
+    :type next_handler: Handler or None
     """
-    async def handle(self, request):
+    CHUNK_SIZE = 64
+
+    def __init__(self, executor=None, next_handler=None):
+        """
+        Constructor for the OutputHandler class.
+
+        :param executor: The pool of workers results are rendered and written on, or None for the default of the loop.
+        :type executor: concurrent.futures.Executor or None
+        :param next_handler: The next handler in the chain.
+        :type next_handler: Handler or None
+        """
+        super().__init__(next_handler)
+        self._executor = executor
+        self._pending = None
+        self._writer = None
+
+    async def process(self, request):
         """
         Handle the request by outputting the results to a file or the console, based on the output_type of the request.
-        If there is a next handler in the chain, call its handle method after outputting the results.
+        Results are output in the order of the original inputs. The file is overwritten unless the request is a later
+        window of a streamed request. If the output_type is a list, the results are collected into it as they are, such
+        as to serve them as JSON.
 
-        :param request: The request object containing the results and output_type.
+        :param request: The request object containing the results, output_type and output_format.
         """
-        if type(request.output_type) is str:
-            with open(request.output_type, 'w+') as file:
-                for entity in request.result:
-                    file.write(str(entity))
+        if isinstance(request.output_type, list):
+            with self.timed(len(request.data_input)):
+                request.output_type.extend(request.ordered_result())
         else:
-            for entity in request.result:
-                print(entity)
-            if self._next_handler:
-                await self._next_handler.handle(request)
+            await self.drain()
+            self._pending = asyncio.ensure_future(self.write(
+                request.ordered_result(), request.output_type, request.output_format, request.output_append))
+
+    async def drain(self):
+        """
+        Wait until the results of every request handled so far are written, leaving the writer open.
+        """
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            await pending
+
+    async def flush(self):
+        """
+        Wait until the results of every request handled so far are written, then close the writer.
+        """
+        await self.drain()
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            await asyncio.get_running_loop().run_in_executor(self._executor, writer.close)
+
+    async def write(self, results, output_type, output_format="text", append=False):
+        """
+        Render results in chunks on the workers, then write them to a file or the console. A new writer is opened unless
+        the results are appended to the output of the open one.
+
+        :param results: The results to output, in order.
+        :param output_type: The path of the file to write to, or None to print to the console.
+        :param output_format: The format to write in, a key of `output_writer.FORMATS`.
+        :param append: Whether to append to the output instead of overwriting it.
+        """
+        loop = asyncio.get_running_loop()
+        writer_class = FORMATS[output_format or "text"]
+        with self.timed(len(results)):
+            writer = self._writer
+            if not (append and type(writer) is writer_class and writer.path == output_type):
+                if writer is not None:
+                    self._writer = None
+                    await loop.run_in_executor(self._executor, writer.close)
+                writer = await loop.run_in_executor(self._executor, writer_class, output_type, append)
+                self._writer = writer
+            chunks = await asyncio.gather(*[
+                loop.run_in_executor(self._executor, writer.render, results[start:start + self.CHUNK_SIZE])
+                for start in range(0, len(results), self.CHUNK_SIZE)])
+            await loop.run_in_executor(self._executor, writer.write, chunks)
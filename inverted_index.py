@@ -0,0 +1,140 @@
+import json
+import os
+
+from decoder import JSONDecoder
+
+
+class InvertedIndex:
+    """
+    Reverse lookups over a Snapshot, such as the Pokémon that learn a move.
+
+    The indexes map every move, type and ability to the names of the Pokémon that have it, and every generation to
+    the moves and abilities introduced in it. They are built once from the resources of the snapshot, written next to
+    it as `inverted_index.json`, and loaded from there on first use, so a reverse lookup is a single dictionary access.
+
+    :param snapshot: The snapshot the indexes are built from and stored in.
+    :param decoder: The decoder of the stored resources. Defaults to a JSONDecoder using the fastest installed backend.
+    """
+    FILE = "inverted_index.json"
+    KINDS = ("move", "type", "ability", "move-generation", "ability-generation")
+    MODES = ("pokemon", "move", "ability")
+
+    def __init__(self, snapshot, decoder=None):
+        """
+        Constructor for the InvertedIndex class.
+
+        :param snapshot: The snapshot the indexes are built from and stored in.
+        :param decoder: The decoder of the stored resources. Defaults to a JSONDecoder using the fastest installed
+                        backend.
+        """
+        self.snapshot = snapshot
+        self.decoder = decoder if decoder is not None else JSONDecoder()
+        self.path = os.path.join(snapshot.root, self.FILE)
+        self._indexes = None
+
+    @property
+    def indexes(self):
+        """
+        The indexes, loaded on first use, or built from the snapshot if they have not been written yet.
+
+        :return: A dictionary mapping every kind of `KINDS` to a dictionary of keys to sorted lists of names.
+        :raises ValueError: If the indexes have not been written and the snapshot holds no resources to build them from.
+        """
+        if self._indexes is None:
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as file:
+                    self._indexes = self.decoder.decode(file.read())
+            else:
+                self.build()
+        return self._indexes
+
+    def lookup(self, kind, key):
+        """
+        Look up the names indexed under a key.
+
+        :param kind: The kind of index, one of `KINDS`.
+        :param key: The name of the move, type, ability or generation.
+        :return: The sorted list of names, or None if the key is not in the index.
+        """
+        return self.indexes.get(kind, {}).get(key)
+
+    def build(self):
+        """
+        Build the indexes from every Pokémon, move and ability of the snapshot and write them to disk.
+
+        :raises ValueError: If the snapshot holds no Pokémon, moves or abilities, in which case nothing is written.
+        """
+        if not any(self.snapshot.index.get(mode) for mode in self.MODES):
+            raise ValueError(f"There is no snapshot in '{self.snapshot.root}' to answer reverse lookups from. Run "
+                             f"`driver.py snapshot` or seed it with --seed first.")
+        indexes = {kind: {} for kind in self.KINDS}
+        for mode in self.MODES:
+            for resource_id in set(self.snapshot.index.get(mode, {}).values()):
+                content = self.snapshot.read(mode, resource_id)
+                if content is not None:
+                    self.add(indexes, mode, self.decoder.decode(content, mode))
+        self._indexes = {kind: {key: sorted(names) for key, names in index.items()}
+                         for kind, index in indexes.items()}
+        self.save()
+
+    @staticmethod
+    def add(indexes, mode, data):
+        """
+        Add the keys of a single resource to the indexes.
+
+        :param indexes: The indexes being built, mapping every kind to a dictionary of keys to sets of names.
+        :param mode: The mode of the resource.
+        :param data: The JSON of the resource.
+        """
+        name = data["name"]
+        if mode == "pokemon":
+            for kind, field, entries in (("move", "move", data["moves"]), ("type", "type", data["types"]),
+                                         ("ability", "ability", data["abilities"])):
+                for entry in entries:
+                    indexes[kind].setdefault(entry[field]["name"], set()).add(name)
+        elif mode in ("move", "ability") and data.get("generation") is not None:
+            indexes[f"{mode}-generation"].setdefault(data["generation"]["name"], set()).add(name)
+
+    def save(self):
+        """
+        Write the indexes to disk.
+        """
+        os.makedirs(self.snapshot.root, exist_ok=True)
+        with open(f"{self.path}.tmp", "w") as file:
+            json.dump(self._indexes, file, separators=(",", ":"))
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+class LookupResult:
+    """
+    The answer to a reverse lookup: the names found under a key in every index the key was looked up in, such as the
+    moves and the abilities introduced in a generation.
+
+    :param mode: The reverse lookup mode, such as "pokemon-by-type".
+    :param key: The name of the move, type, ability or generation looked up.
+    :param sections: The (kind, title, names) of every index the key was found in.
+    """
+    __slots__ = ("mode", "key", "sections")
+
+    def __init__(self, mode, key, sections):
+        """
+        Constructor for the LookupResult class.
+
+        :param mode: The reverse lookup mode, such as "pokemon-by-type".
+        :param key: The name of the move, type, ability or generation looked up.
+        :param sections: The (kind, title, names) of every index the key was found in.
+        """
+        self.mode = mode
+        self.key = key
+        self.sections = sections
+
+    def to_dict(self):
+        """
+        Get the answer as JSON-compatible data.
+
+        :return: The mode, the key, and the names found mapped by the kind of their index.
+        """
+        return {"mode": self.mode, "key": self.key, "names": {kind: list(names) for kind, _, names in self.sections}}
+
+    def __str__(self):
+        return "".join([f"{title} {self.key}: {', '.join(names)}\n" for _, title, names in self.sections]) + "\n"
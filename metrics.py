@@ -0,0 +1,148 @@
+import contextlib
+import json
+import time
+
+
+class Metrics:
+    """
+    Collects timings and counters of the handler chains of a PokeDex.
+
+    Every stage, usually a handler, records its own wall time, the number of items it processed and the number of
+    items that failed. Counters hold totals such as the bytes fetched and the hits and misses of the caches. The
+    collected metrics can be rendered as a human readable summary, as JSON or in the Prometheus text format.
+    """
+    PREFIX = "pokedex"
+
+    def __init__(self):
+        """
+        Constructor for the Metrics class.
+        """
+        self.stages = {}
+        self.counters = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, items=0):
+        """
+        Time a block of work as part of a stage.
+
+        Usage: `with metrics.stage("decode"): ...`
+
+        :param name: The name of the stage.
+        :param items: The number of items processed by the block.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, seconds=time.perf_counter() - start, items=items)
+
+    def record(self, name, seconds=0.0, items=0, errors=0):
+        """
+        Add to the totals of a stage.
+
+        :param name: The name of the stage.
+        :param seconds: The wall time spent in the stage.
+        :param items: The number of items processed.
+        :param errors: The number of items that failed.
+        """
+        stage = self._stage(name)
+        stage["calls"] += 1
+        stage["seconds"] += seconds
+        stage["items"] += items
+        stage["errors"] += errors
+
+    def add_errors(self, name, errors):
+        """
+        Add to the number of items that failed in a stage, without counting it as another run of the stage.
+
+        :param name: The name of the stage.
+        :param errors: The number of items that failed.
+        """
+        if errors:
+            self._stage(name)["errors"] += errors
+
+    def _stage(self, name):
+        """
+        Get the totals of a stage, creating them if the stage has not been recorded yet.
+
+        :param name: The name of the stage.
+        :return: The dictionary of totals of the stage.
+        """
+        return self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "items": 0, "errors": 0})
+
+    def increment(self, name, value=1):
+        """
+        Add to a counter.
+
+        :param name: The name of the counter.
+        :param value: The amount to add.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        """
+        Set a counter to a value, for totals that are kept elsewhere, such as the counters of the entity cache.
+
+        :param name: The name of the counter.
+        :param value: The value of the counter.
+        """
+        self.counters[name] = value
+
+    def reset(self):
+        """
+        Forget every stage and counter.
+        """
+        self.stages.clear()
+        self.counters.clear()
+
+    def to_dict(self):
+        """
+        :return: The stages and counters as a dictionary.
+        """
+        return {"stages": {name: dict(stage) for name, stage in self.stages.items()}, "counters": dict(self.counters)}
+
+    def to_json(self):
+        """
+        :return: The stages and counters as a JSON document.
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self):
+        """
+        :return: The stages and counters in the Prometheus text exposition format.
+        """
+        lines = []
+        for field, help_text in (("seconds", "Wall time spent in each stage."),
+                                 ("items", "Items processed by each stage."),
+                                 ("errors", "Items that failed in each stage."),
+                                 ("calls", "Times each stage ran.")):
+            metric = f"{self.PREFIX}_stage_{field}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, stage in self.stages.items():
+                lines.append(f'{metric}{{stage="{name}"}} {stage[field]}')
+        for name, value in self.counters.items():
+            metric = f"{self.PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+        :return: A human readable table of the stages followed by the counters.
+        """
+        lines = [f"{'Stage':<32}{'Seconds':>10}{'Items':>10}{'Errors':>8}"]
+        for name, stage in self.stages.items():
+            lines.append(f"{name:<32}{stage['seconds']:>10.3f}{stage['items']:>10}{stage['errors']:>8}")
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+    def export(self, export_format):
+        """
+        Render the metrics in a given format.
+
+        :param export_format: "summary", "json" or "prometheus".
+        :return: The rendered metrics.
+        """
+        return {"summary": self.summary, "json": self.to_json, "prometheus": self.to_prometheus}[export_format]()
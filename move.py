@@ -33,80 +33,18 @@ class Move(PokedexObject):
          Initializes a Move object with the specified attributes.
 
      """
+    __slots__ = ("generation", "accuracy", "pp", "power", "type", "damage_class", "effect")
 
     def __init__(self, name=None, ID=None, generation=None, accuracy=None, pp=None, power=None, type=None,
                  damage_class=None, effect=None):
         super().__init__(name, ID)
-        self._generation = generation
-        self._accuracy = accuracy
-        self._pp = pp
-        self._power = power
-        self._type = type
-        self._damage_class = damage_class
-        self._effect = effect
-
-    # Getter and setter methods for generation
-    @property
-    def generation(self):
-        return self._generation
-
-    @generation.setter
-    def generation(self, generation):
-        self._generation = generation
-
-    # Getter and setter methods for accuracy
-    @property
-    def accuracy(self):
-        return self._accuracy
-
-    @accuracy.setter
-    def accuracy(self, accuracy):
-        self._accuracy = accuracy
-
-    # Getter and setter methods for pp
-    @property
-    def pp(self):
-        return self._pp
-
-    @pp.setter
-    def pp(self, pp):
-        self._pp = pp
-
-    # Getter and setter methods for power
-    @property
-    def power(self):
-        return self._power
-
-    @power.setter
-    def power(self, power):
-        self._power = power
-
-    # Getter and setter methods for type
-    @property
-    def type(self):
-        return self._type
-
-    @type.setter
-    def type(self, type):
-        self._type = type
-
-    # Getter and setter methods for damage_class
-    @property
-    def damage_class(self):
-        return self._damage_class
-
-    @damage_class.setter
-    def damage_class(self, damage_class):
-        self._damage_class = damage_class
-
-    # Getter and setter methods for effect
-    @property
-    def effect(self):
-        return self._effect
-
-    @effect.setter
-    def effect(self, effect):
-        self._effect = effect
+        self.generation = generation
+        self.accuracy = accuracy
+        self.pp = pp
+        self.power = power
+        self.type = type
+        self.damage_class = damage_class
+        self.effect = effect
 
     def __str__(self):
         """
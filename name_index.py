@@ -0,0 +1,105 @@
+import difflib
+
+
+class NameIndex:
+    """
+    A local index of every Pokémon, move and ability name, consulted before anything is fetched.
+
+    The names of a mode are listed once through the client, a single request, and kept together with their ids and a
+    trigram index. Exact names then resolve to their id without a request, near misses are matched to the most similar
+    known name, which is suggested as a correction, and inputs that resemble no known name are rejected locally.
+
+    :param client: The client used to list the names of every mode, a PokeAPIClient or a SnapshotClient.
+    :param threshold: The minimum similarity, from 0 to 1, for a known name to be suggested for an unknown input.
+    """
+    LIST_LIMIT = 100000
+
+    def __init__(self, client, threshold=0.5):
+        """
+        Constructor for the NameIndex class.
+
+        :param client: The client used to list the names of every mode, a PokeAPIClient or a SnapshotClient.
+        :param threshold: The minimum similarity, from 0 to 1, for a known name to be suggested for an unknown input.
+        """
+        self._client = client
+        self.threshold = threshold
+        self._ids = {}
+        self._grams = {}
+
+    async def load(self, mode):
+        """
+        List the names of a mode, unless they are already loaded.
+
+        :param mode: The mode to list the names of.
+        :return: True if the names of the mode are known, False if they could not be listed.
+        """
+        if mode not in self._ids:
+            listing = await self._client.get_request(mode, f"?limit={self.LIST_LIMIT}")
+            if not isinstance(listing, dict) or not listing.get("results"):
+                return False
+            self.add(mode, {result["name"]: int(result["url"].rstrip("/").rsplit("/", 1)[-1])
+                            for result in listing["results"]})
+        return True
+
+    def add(self, mode, names):
+        """
+        Add names to the index.
+
+        :param mode: The mode of the names.
+        :param names: A dictionary mapping every name to its id.
+        """
+        self._ids.setdefault(mode, {}).update(names)
+        grams = self._grams.setdefault(mode, {})
+        for name in names:
+            for gram in self.trigrams(name):
+                grams.setdefault(gram, set()).add(name)
+
+    def resolve(self, mode, single_input):
+        """
+        Resolve an input to the id of the resource it names.
+
+        :param mode: The mode of the input.
+        :param single_input: A name or an id.
+        :return: The id of the resource, the input itself if it is an id or the names of the mode are not loaded, or
+                 None if it is not a known name.
+        """
+        key = str(single_input).strip().lower()
+        if key.isdecimal() or mode not in self._ids:
+            return single_input
+        return self._ids[mode].get(key)
+
+    def suggest(self, mode, single_input):
+        """
+        Find the known name most similar to an unknown input.
+
+        Candidates share at least one trigram with the input and are scored by the Dice coefficient of their trigrams,
+        with ties broken by their edit similarity.
+
+        :param mode: The mode of the input.
+        :param single_input: The unknown input.
+        :return: The most similar name, or None if no name is at least as similar as the threshold.
+        """
+        key = str(single_input).strip().lower()
+        grams = self.trigrams(key)
+        shared = {}
+        for gram in grams:
+            for name in self._grams.get(mode, {}).get(gram, ()):
+                shared[name] = shared.get(name, 0) + 1
+        best, best_score = None, None
+        for name, count in sorted(shared.items()):
+            score = (2 * count / (len(grams) + len(self.trigrams(name))),
+                     difflib.SequenceMatcher(None, key, name).ratio())
+            if score[0] >= self.threshold and (best_score is None or score > best_score):
+                best, best_score = name, score
+        return best
+
+    @staticmethod
+    def trigrams(name):
+        """
+        Split a name into its trigrams, padded so that the start and the end of the name weigh more.
+
+        :param name: The name.
+        :return: The set of trigrams.
+        """
+        padded = f"  {name} "
+        return {padded[index:index + 3] for index in range(len(padded) - 2)}
@@ -0,0 +1,313 @@
+import csv
+import json
+import sys
+
+from ability import Ability
+from inverted_index import LookupResult
+from move import Move
+from pokedex_object import PokedexObject
+from pokemon import Pokemon
+from stats import Stats
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+SCHEMAS = {
+    Pokemon: {"name": "str", "ID": "int", "height": "int", "weight": "int", "stats": "json", "types": "json",
+              "abilities": "json", "moves": "json", "expanded": "bool", "unfetched": "json"},
+    Move: {"name": "str", "ID": "int", "generation": "str", "accuracy": "int", "pp": "int", "power": "int",
+           "type": "str", "damage_class": "str", "effect": "str"},
+    Ability: {"name": "str", "ID": "int", "generation": "str", "effect": "str", "effectShort": "str", "pokemon": "str"},
+    Stats: {"name": "str", "ID": "int", "is_battle": "bool", "move_damage_class": "json"},
+}
+"""The columns of the table of every type of entity, in the order of its fields, mapped to their kind: "int", "float",
+"bool", "str", or "json" for lists and dictionaries written as JSON."""
+
+
+def to_record(result):
+    """
+    Convert a result of a chain to a record of its fields.
+
+    :param result: A populated entity, the answer to a reverse lookup, or the text describing an invalid input.
+    :return: The fields of the entity or of the answer, or a dictionary holding the error.
+    """
+    if isinstance(result, (PokedexObject, LookupResult)):
+        return result.to_dict()
+    return {"error": str(result).strip()}
+
+
+def flatten(record):
+    """
+    Flatten a record into a row of scalar columns, encoding every list or dictionary as compact JSON.
+
+    :param record: The fields of an entity.
+    :return: The row.
+    """
+    return {key: json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+            if isinstance(value, (list, dict)) else value for key, value in record.items()}
+
+
+class OutputWriter:
+    """
+    Writes the results of requests to a file or the console in the human-readable text of every entity.
+
+    A writer stays open across the windows of a streamed request until it is closed. `render` is called on worker
+    threads, several chunks at a time, while `write` and `close` are only called one at a time, in order.
+
+    :param path: The path of the file to write to, or None to write to the console.
+    :param append: Whether to append to the file instead of overwriting it.
+    """
+    BUFFER_SIZE = 1 << 20
+    NEWLINE = None
+
+    def __init__(self, path=None, append=False):
+        """
+        Constructor for the OutputWriter class.
+
+        :param path: The path of the file to write to, or None to write to the console.
+        :param append: Whether to append to the file instead of overwriting it.
+        """
+        self.path = path
+        self._file = None
+        if path is not None:
+            self._file = open(path, 'a' if append else 'w+', buffering=self.BUFFER_SIZE, newline=self.NEWLINE)
+
+    @property
+    def file(self):
+        """
+        The file written to, the standard output if the writer writes to the console.
+        """
+        return self._file if self._file is not None else sys.stdout
+
+    def render(self, results):
+        """
+        Render a chunk of results to text.
+
+        :param results: The results, entities or text describing invalid inputs.
+        :return: The text of every result.
+        """
+        end = "" if self.path is not None else "\n"
+        return [f"{result}{end}" for result in results]
+
+    def write(self, chunks):
+        """
+        Write rendered chunks.
+
+        :param chunks: The rendered chunks, in order.
+        """
+        for chunk in chunks:
+            self.file.writelines(chunk)
+        self.file.flush()
+
+    def close(self):
+        """
+        Write out everything still buffered and close the file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JsonLinesWriter(OutputWriter):
+    """
+    Writes the results of requests as JSON Lines, one object holding the fields of an entity, or the error of an
+    invalid input, per line.
+
+    :param path: The path of the file to write to, or None to write to the console.
+    :param append: Whether to append to the file instead of overwriting it.
+    """
+
+    def render(self, results):
+        """
+        Render a chunk of results to JSON lines.
+
+        :param results: The results, entities or text describing invalid inputs.
+        :return: The line of every result.
+        """
+        return [json.dumps(to_record(result), ensure_ascii=False, separators=(",", ":")) + "\n" for result in results]
+
+
+class TableWriter(OutputWriter):
+    """
+    A base class for writers of tables, with one row per entity and the columns of the type of the entities.
+
+    The columns and their kinds are those of the type of the first entity in `SCHEMAS`, so every row of a table has the
+    same columns whatever its values. A table holds entities of a single type. Lists and dictionaries, such as the
+    moves of a Pokémon, are written as JSON. Invalid inputs are not rows of the table and are reported on stderr
+    instead.
+
+    :param path: The path of the file to write to, or None to write to the console.
+    :param append: Whether to append to the file instead of overwriting it.
+    """
+
+    def __init__(self, path=None, append=False):
+        """
+        Constructor for the TableWriter class.
+
+        :param path: The path of the file to write to, or None to write to the console.
+        :param append: Whether to append to the file instead of overwriting it.
+        """
+        super().__init__(path, append)
+        self.entity_type = None
+        self.schema = None
+
+    def render(self, results):
+        """
+        Convert a chunk of results to rows.
+
+        :param results: The results, entities or text describing invalid inputs.
+        :return: A (type, row) pair for every result, and a (None, record of the error) pair for every invalid input.
+        """
+        return [(None, to_record(result)) if isinstance(result, str) else (type(result), flatten(to_record(result)))
+                for result in results]
+
+    def rows(self, chunks):
+        """
+        Iterate over the rows of rendered chunks, taking the schema from the first entity and reporting every invalid
+        input on stderr.
+
+        :param chunks: The rendered chunks, in order.
+        :return: A generator of the rows of the entities.
+        :raises ValueError: If an entity is of another type than the first one, or has other fields than its schema.
+        """
+        for chunk in chunks:
+            for entity_type, row in chunk:
+                if entity_type is None:
+                    print(row["error"], file=sys.stderr)
+                    continue
+                if entity_type not in SCHEMAS:
+                    raise ValueError(f"Cannot write a {entity_type.__name__} to a table of entities.")
+                if self.entity_type is None:
+                    self.entity_type, self.schema = entity_type, SCHEMAS[entity_type]
+                if entity_type is not self.entity_type:
+                    raise ValueError(f"Cannot write the {entity_type.__name__} {row['name']} to a table of "
+                                     f"{self.entity_type.__name__} entities. Write one type of entity per table.")
+                if row.keys() != self.schema.keys():
+                    raise ValueError(f"The fields of {entity_type.__name__} do not match its schema: "
+                                     f"{', '.join(sorted(row.keys() ^ self.schema.keys()))}.")
+                yield row
+
+
+class CsvWriter(TableWriter):
+    """
+    Writes the results of requests as CSV, one row per entity, with a header naming the columns of the type of the
+    entities.
+
+    :param path: The path of the file to write to, or None to write to the console.
+    :param append: Whether to append to the file instead of overwriting it.
+    """
+    NEWLINE = ""
+
+    def __init__(self, path=None, append=False):
+        """
+        Constructor for the CsvWriter class.
+
+        :param path: The path of the file to write to, or None to write to the console.
+        :param append: Whether to append to the file instead of overwriting it.
+        """
+        super().__init__(path, append)
+        self._header = append and self.path is not None and self.file.tell() > 0
+        self._writer = None
+
+    def write(self, chunks):
+        """
+        Write the rows of rendered chunks, writing the header before the first row unless the file already has one.
+
+        :param chunks: The rendered chunks, in order.
+        """
+        for row in self.rows(chunks):
+            if self._writer is None:
+                self._writer = csv.DictWriter(self.file, fieldnames=list(self.schema))
+            if not self._header:
+                self._writer.writeheader()
+                self._header = True
+            self._writer.writerow(row)
+        self.file.flush()
+
+
+class ParquetWriter(TableWriter):
+    """
+    Writes the results of requests as Parquet, one row per entity, in row groups of up to `BATCH_SIZE` rows that are
+    each converted and written one column at a time. The Parquet schema is built from the schema of the type of the
+    entities, so every row group has the same column types whatever values it holds.
+
+    Writing Parquet requires pyarrow, and the file is always overwritten.
+
+    :param path: The path of the file to write to.
+    :param append: Must be False, since a Parquet file cannot be appended to once it is closed.
+    """
+    BATCH_SIZE = 8192
+
+    def __init__(self, path=None, append=False):
+        """
+        Constructor for the ParquetWriter class.
+
+        :param path: The path of the file to write to.
+        :param append: Must be False, since a Parquet file cannot be appended to once it is closed.
+        """
+        self.check(path, append)
+        self.path = path
+        self._file = None
+        self.entity_type = None
+        self.schema = None
+        self._writer = None
+        self._rows = []
+
+    @staticmethod
+    def check(path, append=False):
+        """
+        Check that Parquet can be written to a path.
+
+        :param path: The path of the file to write to.
+        :param append: Whether the file would be appended to.
+        :raises ValueError: If pyarrow is not installed, no path is given or the file would be appended to.
+        """
+        if pyarrow is None:
+            raise ValueError("Writing Parquet requires pyarrow, which is not installed.")
+        if path is None:
+            raise ValueError("Parquet can only be written to a file.")
+        if append:
+            raise ValueError("A Parquet file cannot be appended to.")
+
+    def write(self, chunks):
+        """
+        Collect the rows of rendered chunks, writing a row group whenever a batch is full.
+
+        :param chunks: The rendered chunks, in order.
+        """
+        for row in self.rows(chunks):
+            self._rows.append(row)
+            if len(self._rows) >= self.BATCH_SIZE:
+                self.write_batch()
+
+    def write_batch(self):
+        """
+        Write the collected rows as a row group, opening the file on the first one. No file is written if there are no
+        rows at all.
+        """
+        if not self._rows:
+            return
+        if self._writer is None:
+            types = {"int": pyarrow.int64(), "float": pyarrow.float64(), "bool": pyarrow.bool_(),
+                     "str": pyarrow.string(), "json": pyarrow.string()}
+            schema = pyarrow.schema([(name, types[kind]) for name, kind in self.schema.items()])
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, schema)
+        columns = {name: [row[name] for row in self._rows] for name in self.schema}
+        self._writer.write_table(pyarrow.Table.from_pydict(columns, schema=self._writer.schema))
+        self._rows = []
+
+    def close(self):
+        """
+        Write the remaining rows and close the file.
+        """
+        self.write_batch()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+FORMATS = {"text": OutputWriter, "jsonl": JsonLinesWriter, "csv": CsvWriter, "parquet": ParquetWriter}
@@ -0,0 +1,133 @@
+import asyncio
+
+
+class Pipeline:
+    """
+    Runs requests through the handlers of a chain as a pipeline of stages connected by bounded queues.
+
+    Every handler of the chain is a stage that processes one request at a time and passes it on to the queue of the
+    next stage, so a request can be fetched while the one before it is populated and the one before that is written,
+    instead of every stage waiting for the whole input. Stages whose handler is `CONCURRENT` process up to `workers`
+    requests at the same time and may finish them out of order. Every other stage takes the requests in the order they
+    were fed, so the results are output in the order of the inputs. A full queue holds back the stages before it, so at
+    most about `queue_size` requests wait between two stages however long the input is, and no more than `max_ahead`
+    requests are fed before the oldest of them has left the last stage. The requests an ordered stage holds back until
+    those before them arrive are in flight, so they are bounded by `max_ahead` too, however slow a single request is.
+
+    :param start_handler: The first handler of the chain.
+    :type start_handler: Handler
+    :param workers: The number of requests a concurrent stage processes at the same time.
+    :param queue_size: The maximum number of requests waiting in the queue in front of every stage.
+    :param max_ahead: The maximum number of requests in flight. Defaults to `workers + queue_size`.
+    """
+
+    def __init__(self, start_handler, workers=8, queue_size=8, max_ahead=None):
+        """
+        Constructor for the Pipeline class.
+
+        :param start_handler: The first handler of the chain.
+        :type start_handler: Handler
+        :param workers: The number of requests a concurrent stage processes at the same time.
+        :param queue_size: The maximum number of requests waiting in the queue in front of every stage.
+        :param max_ahead: The maximum number of requests in flight. Defaults to `workers + queue_size`.
+        """
+        self.stages = []
+        handler = start_handler
+        while handler is not None:
+            self.stages.append(handler)
+            handler = handler.next_handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_ahead = max_ahead if max_ahead is not None else workers + queue_size
+
+    async def run(self, requests):
+        """
+        Run requests through every stage. If a stage fails, the other stages are cancelled and the error is raised.
+
+        :param requests: The requests, read lazily, such as the windows of a stream.
+        """
+        queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        in_flight = asyncio.Semaphore(self.max_ahead)
+        tasks = [asyncio.create_task(self._feed(requests, queues[0], in_flight))]
+        for index, stage in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            tasks.append(asyncio.create_task(self._run_stage(stage, queues[index], outbox, in_flight)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def _feed(requests, inbox, in_flight):
+        """
+        Feed requests to the first stage, numbered in order, followed by None once there are no more. A request is
+        only read once fewer than `max_ahead` requests are in flight.
+
+        :param requests: The requests.
+        :param inbox: The queue of the first stage.
+        :param in_flight: The semaphore counting the requests in flight.
+        """
+        for sequence, request in enumerate(requests):
+            await in_flight.acquire()
+            await inbox.put((sequence, request))
+        await inbox.put(None)
+
+    async def _run_stage(self, handler, inbox, outbox, in_flight):
+        """
+        Process every request of a stage and pass it on, followed by None once the stage is done.
+
+        :param handler: The handler of the stage.
+        :param inbox: The queue of the stage.
+        :param outbox: The queue of the next stage, or None for the last stage.
+        :param in_flight: The semaphore counting the requests in flight, released as requests leave the last stage.
+        """
+        if handler.CONCURRENT:
+            await asyncio.gather(*[self._work(handler, inbox, outbox, in_flight) for _ in range(self.workers)])
+        else:
+            await self._work_in_order(handler, inbox, outbox, in_flight)
+        if outbox is not None:
+            await outbox.put(None)
+
+    @staticmethod
+    async def _work(handler, inbox, outbox, in_flight):
+        """
+        Process requests as they arrive until the end of the input is reached.
+
+        :param handler: The handler of the stage.
+        :param inbox: The queue of the stage.
+        :param outbox: The queue of the next stage, or None for the last stage.
+        :param in_flight: The semaphore counting the requests in flight.
+        """
+        while True:
+            item = await inbox.get()
+            if item is None:
+                await inbox.put(None)
+                return
+            await handler.process(item[1])
+            if outbox is not None:
+                await outbox.put(item)
+            else:
+                in_flight.release()
+
+    @staticmethod
+    async def _work_in_order(handler, inbox, outbox, in_flight):
+        """
+        Process requests one at a time in the order they were fed, holding back those that arrive early.
+
+        :param handler: The handler of the stage.
+        :param inbox: The queue of the stage.
+        :param outbox: The queue of the next stage, or None for the last stage.
+        :param in_flight: The semaphore counting the requests in flight.
+        """
+        held, sequence = {}, 0
+        while (item := await inbox.get()) is not None:
+            held[item[0]] = item[1]
+            while sequence in held:
+                request = held.pop(sequence)
+                await handler.process(request)
+                if outbox is not None:
+                    await outbox.put((sequence, request))
+                else:
+                    in_flight.release()
+                sequence += 1
@@ -1,20 +1,42 @@
+import itertools
 import json
 
 import requests as pokeapi
 
 from ability import Ability
+from api_client import PokeAPIClient
+from dex_store import DexStore
+from entity_cache import EntityCache
+from metrics import Metrics
 from enum import Enum
 from move import Move
 from pokemon import Pokemon
 from handlers import CreateEntityHandler, PopulatePokemonHandler, PopulateExpandedPokemonHandler, OutputHandler, \
-    PopulateAbilityHandler, GetRequestsHandler, PopulateMovesHandler
+    PopulateAbilityHandler, GetRequestsHandler, PopulateMovesHandler, NormaliseInputHandler, ResolveNamesHandler, \
+    ReverseLookupHandler, RouteHandler
+from inverted_index import InvertedIndex
+from name_index import NameIndex
+from pipeline import Pipeline
 from request import Request
+from snapshot import Snapshot
 
 
 class PokedexMode(Enum):
     POKEMON = "pokemon"
     ABILITY = "ability"
     MOVE = "move"
+    POKEMON_BY_MOVE = "pokemon-by-move"
+    POKEMON_BY_TYPE = "pokemon-by-type"
+    POKEMON_BY_ABILITY = "pokemon-by-ability"
+    GENERATION = "generation"
+    BATCH = "batch"
+
+    @property
+    def is_reverse(self):
+        """
+        bool: Whether the mode is answered from the inverted index instead of the PokeAPI.
+        """
+        return self.value in ReverseLookupHandler.LOOKUPS
 
 
 class PokeDex:
@@ -23,81 +45,261 @@ class PokeDex:
 
     Attributes:
     -----------
-    ex_pokemon_start_handler : GetRequestsHandler
+    WINDOW_SIZE : int
+        The number of inputs of a stream processed per window by default, by library and command line callers alike.
+    client : PokeAPIClient or SnapshotClient
+        The client, with its pooled session, shared by every handler of every chain.
+    entities : EntityCache
+        The in-memory cache of populated entities shared by every handler of every chain.
+    metrics : Metrics
+        The timings and counters recorded by the client and by every handler of every chain.
+    index : InvertedIndex
+        The inverted index answering reverse lookups.
+    names : NameIndex or None
+        The index of names every input is resolved against before it is fetched, or None to fetch every input as is.
+    pipeline_workers : int
+        The number of windows of a stream every concurrent stage of its pipeline processes at the same time.
+    ex_pokemon_start_handler : NormaliseInputHandler
         The start of the chain of handlers for handling requests for expanded Pokémon information.
-    pokemon_start_handler : GetRequestsHandler
+    pokemon_start_handler : NormaliseInputHandler
         The start of the chain of handlers for handling requests for Pokémon information.
-    ability_start_handler : GetRequestsHandler
+    ability_start_handler : NormaliseInputHandler
         The start of the chain of handlers for handling requests for ability information.
-    move_start_handler : GetRequestsHandler
+    move_start_handler : NormaliseInputHandler
         The start of the chain of handlers for handling requests for move information.
+    reverse_start_handler : NormaliseInputHandler
+        The start of the chain of handlers for handling reverse lookups, such as the Pokémon that learn a move.
+    batch_start_handler : RouteHandler
+        The start of the chain of handlers for handling batches mixing every other mode, routing each item to the
+        chain of its mode.
 
     Methods:
     --------
-    __init__(self):
+    __init__(self, limit_per_host=10, keepalive_timeout=30, max_concurrency=20, cache=None, cache_bypass=False,
+             entity_cache_size=2048, client=None, scheduler=None, retry_policy=None, decoder=None,
+             index=None, resolve_names=False, pipeline_workers=8):
         Initializes a new PokeDex object with the necessary handlers for handling requests.
     execute_request(self, request: Request):
         Executes the given request and handles it appropriately based on the specified PokeDex mode.
+    execute_stream(self, request: Request, inputs, window_size=WINDOW_SIZE):
+        Executes the given request over a lazily read stream of inputs, pipelining bounded windows through the chain.
+    chain(self, request: Request):
+        Returns the start of the chain of handlers for the mode of the given request.
+    dispatch(self, request: Request):
+        Passes the given request to the start of the chain of its mode, without waiting for its output to be written.
+    flush(self):
+        Waits until the output of every dispatched request is written.
+    dex_store(self, snapshot=None):
+        Loads the Pokémon and moves of a snapshot into a columnar DexStore for analytical queries.
+    report_metrics(self, export_format="summary"):
+        Renders the metrics recorded so far as a summary, JSON or Prometheus text.
+    close(self):
+        Closes the shared session of the PokeDex.
     """
-    def __init__(self):
+    WINDOW_SIZE = 10
+
+    def __init__(self, limit_per_host=10, keepalive_timeout=30, max_concurrency=20, cache=None, cache_bypass=False,
+                 entity_cache_size=2048, client=None, scheduler=None, retry_policy=None, decoder=None,
+                 index=None, resolve_names=False, pipeline_workers=8):
         """
         Initializes a new PokeDex object with the necessary handlers for handling requests.
+
+        Parameters:
+        -----------
+        limit_per_host : int
+            The maximum number of simultaneous connections to the PokeAPI host.
+        keepalive_timeout : float
+            The number of seconds an idle connection is kept open for reuse.
+        max_concurrency : int
+            The maximum number of stat, ability and move requests in flight while expanding Pokémon.
+        cache : ResponseCache
+            The persistent cache of API responses, or None to always use the network.
+        cache_bypass : bool
+            Whether to skip reading from the cache while still storing fresh responses in it.
+        entity_cache_size : int
+            The maximum number of populated entities kept in memory between requests.
+        client : PokeAPIClient or SnapshotClient
+            The client used to look up resources, such as a SnapshotClient to run offline. When it is not provided a
+            PokeAPIClient is created from the connection, cache, scheduler, retry and decoder settings.
+        scheduler : RequestScheduler
+            The scheduler bounding the number and the rate of requests to the PokeAPI. Defaults to one without a rate
+            limit.
+        retry_policy : RetryPolicy
+            The policy for retrying requests to the PokeAPI that failed transiently. Defaults to the default policy.
+        decoder : JSONDecoder
+            The decoder of response bodies. Defaults to one using the fastest installed JSON backend.
+        index : InvertedIndex
+            The inverted index answering reverse lookups. Defaults to the index of the snapshot in `snapshot/`.
+        resolve_names : bool
+            Whether to resolve every input against an index of the names of its mode, listed once through the client,
+            so that misspelled and unknown inputs are rejected without being fetched.
+        pipeline_workers : int
+            The number of windows of a stream every concurrent stage of its pipeline, such as fetching, processes at
+            the same time.
         """
         self._start_event_handler = None
+        if client is None:
+            client = PokeAPIClient(limit_per_host=limit_per_host, keepalive_timeout=keepalive_timeout, cache=cache,
+                                   cache_bypass=cache_bypass, scheduler=scheduler, retry_policy=retry_policy,
+                                   decoder=decoder)
+        self.client = client
+        self.entities = EntityCache(entity_cache_size)
+        self.names = NameIndex(self.client) if resolve_names else None
+        self.pipeline_workers = pipeline_workers
+        self._active = 0
 
         # expanded pokemon chain
-        ex_pokemon_handle_get_requests = GetRequestsHandler()
+        ex_pokemon_handle_normalise = NormaliseInputHandler()
+        ex_pokemon_handle_resolve = ResolveNamesHandler(self.names)
+        ex_pokemon_handle_get_requests = GetRequestsHandler(self.client, self.entities)
         ex_pokemon_handle_create = CreateEntityHandler()
-        ex_pokemon_handle_populate = PopulateExpandedPokemonHandler()
+        ex_pokemon_handle_populate = PopulateExpandedPokemonHandler(self.client, self.entities, max_concurrency)
         ex_pokemon_handle_output = OutputHandler()
 
         # set handlers
+        ex_pokemon_handle_normalise.set_next_handler(ex_pokemon_handle_resolve)
+        ex_pokemon_handle_resolve.set_next_handler(ex_pokemon_handle_get_requests)
         ex_pokemon_handle_get_requests.set_next_handler(ex_pokemon_handle_create)
         ex_pokemon_handle_create.set_next_handler(ex_pokemon_handle_populate)
         ex_pokemon_handle_populate.set_next_handler(ex_pokemon_handle_output)
 
         # pokemon chain
-        pokemon_handle_get_requests = GetRequestsHandler()
+        pokemon_handle_normalise = NormaliseInputHandler()
+        pokemon_handle_resolve = ResolveNamesHandler(self.names)
+        pokemon_handle_get_requests = GetRequestsHandler(self.client, self.entities)
         pokemon_handle_create = CreateEntityHandler()
-        pokemon_handle_populate = PopulatePokemonHandler()
+        pokemon_handle_populate = PopulatePokemonHandler(self.entities)
         pokemon_handle_output = OutputHandler()
 
         # set handlers
+        pokemon_handle_normalise.set_next_handler(pokemon_handle_resolve)
+        pokemon_handle_resolve.set_next_handler(pokemon_handle_get_requests)
         pokemon_handle_get_requests.set_next_handler(pokemon_handle_create)
         pokemon_handle_create.set_next_handler(pokemon_handle_populate)
         pokemon_handle_populate.set_next_handler(pokemon_handle_output)
 
         # ability chain
-        ability_handle_get_requests = GetRequestsHandler()
+        ability_handle_normalise = NormaliseInputHandler()
+        ability_handle_resolve = ResolveNamesHandler(self.names)
+        ability_handle_get_requests = GetRequestsHandler(self.client, self.entities)
         ability_handle_create = CreateEntityHandler()
-        ability_handle_populate = PopulateAbilityHandler()
+        ability_handle_populate = PopulateAbilityHandler(self.entities)
         ability_handle_output = OutputHandler()
 
         # set handlers
+        ability_handle_normalise.set_next_handler(ability_handle_resolve)
+        ability_handle_resolve.set_next_handler(ability_handle_get_requests)
         ability_handle_get_requests.set_next_handler(ability_handle_create)
         ability_handle_create.set_next_handler(ability_handle_populate)
         ability_handle_populate.set_next_handler(ability_handle_output)
 
         # move chain
-        move_handle_get_requests = GetRequestsHandler()
+        move_handle_normalise = NormaliseInputHandler()
+        move_handle_resolve = ResolveNamesHandler(self.names)
+        move_handle_get_requests = GetRequestsHandler(self.client, self.entities)
         move_handle_get_create = CreateEntityHandler()
-        move_handle_populate = PopulateMovesHandler()
+        move_handle_populate = PopulateMovesHandler(self.entities)
         move_handle_output = OutputHandler()
 
         # set handlers
+        move_handle_normalise.set_next_handler(move_handle_resolve)
+        move_handle_resolve.set_next_handler(move_handle_get_requests)
         move_handle_get_requests.set_next_handler(move_handle_get_create)
         move_handle_get_create.set_next_handler(move_handle_populate)
         move_handle_populate.set_next_handler(move_handle_output)
 
+        # reverse lookup chain
+        self.index = index if index is not None else InvertedIndex(Snapshot("snapshot"))
+        reverse_handle_normalise = NormaliseInputHandler()
+        reverse_handle_lookup = ReverseLookupHandler(self.index)
+        reverse_handle_output = OutputHandler()
+
+        # set handlers
+        reverse_handle_normalise.set_next_handler(reverse_handle_lookup)
+        reverse_handle_lookup.set_next_handler(reverse_handle_output)
+
+        # batch chain
+        batch_handle_route = RouteHandler({
+            "pokemon": pokemon_handle_normalise, "pokemon-expanded": ex_pokemon_handle_normalise,
+            "ability": ability_handle_normalise, "move": move_handle_normalise,
+            **{mode: reverse_handle_normalise for mode in ReverseLookupHandler.LOOKUPS}})
+        batch_handle_output = OutputHandler()
+
+        # set handlers
+        batch_handle_route.set_next_handler(batch_handle_output)
+
         # set start handlers
-        self.ex_pokemon_start_handler = ex_pokemon_handle_get_requests
-        self.pokemon_start_handler = pokemon_handle_get_requests
-        self.ability_start_handler = ability_handle_get_requests
-        self.move_start_handler = move_handle_get_requests
+        self.ex_pokemon_start_handler = ex_pokemon_handle_normalise
+        self.pokemon_start_handler = pokemon_handle_normalise
+        self.ability_start_handler = ability_handle_normalise
+        self.move_start_handler = move_handle_normalise
+        self.reverse_start_handler = reverse_handle_normalise
+        self.batch_start_handler = batch_handle_route
+
+        # share one set of metrics
+        self.metrics = Metrics()
+        self.client.metrics = self.metrics
+        for handler in self.handlers():
+            handler.set_metrics(self.metrics)
+
+    def handlers(self):
+        """
+        Lists every handler of every chain.
+
+        Returns:
+        --------
+        list of Handler
+            The handlers, chain by chain, in the order they handle requests.
+        """
+        handlers = []
+        for handler in (self.ex_pokemon_start_handler, self.pokemon_start_handler, self.ability_start_handler,
+                        self.move_start_handler, self.reverse_start_handler, self.batch_start_handler):
+            while handler is not None:
+                handlers.append(handler)
+                handler = handler.next_handler
+        return handlers
+
+    def dex_store(self, snapshot=None):
+        """
+        Loads every Pokémon and move of a snapshot into a columnar store, for queries over the whole dex such as
+        `pokedex.dex_store().moves.aggregate("power", "mean", by="generation")`.
+
+        Parameters:
+        -----------
+        snapshot : Snapshot
+            The snapshot to load. Defaults to the snapshot of the inverted index.
+
+        Returns:
+        --------
+        DexStore
+            The Pokémon and moves of the snapshot.
+        """
+        snapshot = snapshot if snapshot is not None else self.index.snapshot
+        return DexStore.from_snapshot(snapshot, self.index.decoder)
+
+    def report_metrics(self, export_format="summary"):
+        """
+        Renders the metrics recorded so far, including the counters of the entity cache.
+
+        Parameters:
+        -----------
+        export_format : str
+            "summary" for a human readable table, "json" or "prometheus" for the Prometheus text format.
+
+        Returns:
+        --------
+        str
+            The rendered metrics.
+        """
+        self.metrics.set("entity_cache_hits", self.entities.hits)
+        self.metrics.set("entity_cache_misses", self.entities.misses)
+        return self.metrics.export(export_format)
 
     async def execute_request(self, request: Request):
         """
         Executes a request by delegating to the appropriate handler based on the mode specified in the request.
+        Every unique resource is fetched at most once while the request is executed, and its results are written out
+        before this returns.
 
         Parameters:
         -----------
@@ -112,14 +314,152 @@ class PokeDex:
         --------
         None
         """
-        if request.expanded:
-            await self.ex_pokemon_start_handler.handle(request)
+        await self.dispatch(request)
+        await self.flush()
+
+    async def dispatch(self, request: Request):
+        """
+        Passes a request to the start of the chain of its mode. The write of its results may still be pending when
+        this returns. Requests running at the same time, such as those of the server, share their coalesced requests
+        to the PokeAPI, which are forgotten once no request is running any more.
+
+        Parameters:
+        -----------
+        request : Request
+            The request to be dispatched.
+
+        Returns:
+        --------
+        None
+        """
+        self._active += 1
+        try:
+            handler = self.chain(request)
+            if handler is not None:
+                await handler.handle(request)
+        finally:
+            self._release()
+
+    def _release(self):
+        """
+        Ends a running request, forgetting the coalesced requests to the PokeAPI once no other request is running,
+        so that memory stays flat between requests.
+        """
+        self._active -= 1
+        if self._active == 0:
+            self.client.clear_requests()
+
+    def chain(self, request: Request):
+        """
+        Returns the start of the chain of handlers for the mode of a request.
+
+        Parameters:
+        -----------
+        request : Request
+            The request to find the chain of.
+
+        Returns:
+        --------
+        Handler or None
+            The first handler of the chain, or None if no chain handles the mode of the request.
+        """
+        if request.poke_dex_mode == PokedexMode.BATCH:
+            return self.batch_start_handler
+
+        elif request.poke_dex_mode.is_reverse:
+            return self.reverse_start_handler
+
+        elif request.expanded:
+            return self.ex_pokemon_start_handler
 
         elif request.poke_dex_mode == PokedexMode.POKEMON:
-            await self.pokemon_start_handler.handle(request)
+            return self.pokemon_start_handler
 
         elif request.poke_dex_mode == PokedexMode.ABILITY:
-            await self.ability_start_handler.handle(request)
+            return self.ability_start_handler
 
         elif request.poke_dex_mode == PokedexMode.MOVE:
-            await self.move_start_handler.handle(request)
+            return self.move_start_handler
+        return None
+
+    async def execute_stream(self, request: Request, inputs, window_size=WINDOW_SIZE):
+        """
+        Executes a request over a stream of inputs, pipelining its windows through the chain.
+
+        The inputs are read lazily in windows that flow through the handlers of the chain as the stages of a Pipeline,
+        so a window is fetched while earlier ones are still being populated and written. The windows are written out
+        in order, and memory stays flat however long the stream is, as the windows in flight are bounded and the client
+        only keeps its most recently completed requests for coalescing. With small windows, results are output about as
+        soon as their own resources are fetched.
+
+        Parameters:
+        -----------
+        request : Request
+            The request holding the settings shared by every window. Its data input is ignored.
+        inputs : iterable of str
+            The inputs, such as the lines of an input file.
+        window_size : int
+            The number of inputs processed per window. Defaults to `WINDOW_SIZE`.
+
+        Returns:
+        --------
+        None
+        """
+        handler = self.chain(request)
+        if handler is None:
+            return
+        self._active += 1
+        try:
+            await Pipeline(handler, workers=self.pipeline_workers).run(self._windows(request, inputs, window_size))
+            await self.flush()
+        finally:
+            self._release()
+
+    @staticmethod
+    def _windows(request: Request, inputs, window_size):
+        """
+        Splits a stream of inputs into requests of one window each, read lazily.
+
+        Parameters:
+        -----------
+        request : Request
+            The request holding the settings shared by every window.
+        inputs : iterable of str
+            The inputs.
+        window_size : int
+            The number of inputs per window.
+
+        Returns:
+        --------
+        generator of Request
+            The request of every window. Every window but the first appends to the output.
+        """
+        inputs = iter(inputs)
+        window = list(itertools.islice(inputs, window_size))
+        first = True
+        while window:
+            window_request = request.window(window)
+            window_request.output_append = not first
+            yield window_request
+            first = False
+            window = list(itertools.islice(inputs, window_size))
+
+    async def flush(self):
+        """
+        Waits until the results of every request dispatched so far are written out.
+        """
+        for handler in self.handlers():
+            if isinstance(handler, OutputHandler):
+                await handler.flush()
+
+    async def close(self):
+        """
+        Closes the session shared by the handlers, releasing its pooled connections, and the response cache.
+        """
+        await self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -5,6 +5,9 @@ class PokedexObject(ABC):
     """
     An abstract base class representing an object in the Pokédex.
 
+    Entities are slotted: their fields are plain attributes stored in fixed slots instead of a per-instance
+    `__dict__`, which keeps a whole dex in memory small and makes reading a field a single slot lookup.
+
     Attributes:
     -----------
     name : str
@@ -16,7 +19,10 @@ class PokedexObject(ABC):
     --------
     __init__(self, name, ID):
         Initializes a new PokedexObject with the given name and ID.
+    to_dict(self):
+        Returns the fields of the object as a dictionary.
     """
+    __slots__ = ("name", "ID")
 
     def __init__(self, name, ID):
         """
@@ -29,43 +35,20 @@ class PokedexObject(ABC):
         ID : int
             The ID number of the object.
         """
-        self._name = name
-        self._ID = ID
+        self.name = name
+        self.ID = ID
 
-    @property
-    def name(self):
-        """
-        str: The name of the object.
-        """
-        return self._name
-
-    @name.setter
-    def name(self, name):
-        """
-        Set the name of the object.
-
-        Parameters:
-        -----------
-        name : str
-            The new name value to set.
+    def to_dict(self):
         """
-        self._name = name
+        Return the fields of the object as a dictionary, such as for serialising it to JSON.
 
-    @property
-    def ID(self):
-        """
-        int: The ID number of the object.
-        """
-        return self._ID
-
-    @ID.setter
-    def ID(self, ID):
-        """
-        Set the ID number of the object.
-
-        Parameters:
-        -----------
-        ID : int
-            The new ID number value to set.
+        Returns:
+        --------
+        dict
+            The value of every slot of the object, keyed by its public attribute name.
         """
-        self._ID = ID
\ No newline at end of file
+        fields = {}
+        for cls in reversed(type(self).__mro__):
+            for slot in getattr(cls, "__slots__", ()):
+                fields[slot] = getattr(self, slot)
+        return fields
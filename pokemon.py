@@ -1,5 +1,13 @@
+from collections import namedtuple
+
 from pokedex_object import PokedexObject
 
+StatLink = namedtuple("StatLink", ["stat", "base_stat"])
+StatLink.__doc__ = "A base stat of a Pokémon: the Stats entity it refers to and the Pokémon's value of it."
+
+MoveLink = namedtuple("MoveLink", ["move", "level"])
+MoveLink.__doc__ = "A move a Pokémon can learn: the Move entity it refers to and the level it is learned at."
+
 
 class Pokemon(PokedexObject):
     """
@@ -15,27 +23,40 @@ class Pokemon(PokedexObject):
         The height of the Pokémon.
     weight : float
         The weight of the Pokémon.
-    stats : dict
-        A dictionary of the Pokémon's base stats, keyed by stat name (e.g. "hp").
+    stats : list of StatLink
+        A list of the Pokémon's base stats, each linking a Stats entity to its base value.
     types : list of str
         A list of the types of the Pokémon.
     abilities : list of Ability
         A list of the Pokémon's abilities.
-    moves : list of Move
-        A list of the moves the Pokémon can learn.
+    moves : list of MoveLink
+        A list of the moves the Pokémon can learn, each linking a Move entity to the level it is learned at.
+    expanded : bool
+        Whether the stats, abilities and moves are rendered in full or by name only.
+    unfetched : tuple of str
+        The stats, abilities and moves of an expanded Pokémon that could not be fetched, such as "move tackle". They
+        are left out of its stats, abilities and moves and listed separately.
+
+    The referenced Stats, Ability and Move entities are shared between every Pokémon that refers to them, and the
+    text of a Pokémon is only rendered when it is output.
 
     Methods:
     --------
     __init__(self, name=None, id=None, height=None, weight=None, stats=None,
-             types=None, abilities=None, moves=None):
+             types=None, abilities=None, moves=None, expanded=False, unfetched=()):
         Initializes a new Pokemon object with the given attributes.
+    render_stats(self), render_abilities(self), render_moves(self):
+        Render the stats, abilities and moves of the Pokémon, in full if it is expanded.
+    to_dict(self):
+        Returns the fields of the Pokémon as a dictionary, with its stats, abilities and moves nested.
     __str__(self):
         Returns a string representation of the Pokemon object, including its name, ID, height, weight, types,
         stats, abilities, and moves.
     """
+    __slots__ = ("height", "weight", "stats", "types", "abilities", "moves", "expanded", "unfetched")
 
     def __init__(self, name=None, id=None, height=None, weight=None, stats=None,
-                 types=None, abilities=None, moves=None):
+                 types=None, abilities=None, moves=None, expanded=False, unfetched=()):
         """
         Initializes a new Pokemon object with the given attributes.
 
@@ -49,136 +70,100 @@ class Pokemon(PokedexObject):
             The height of the Pokémon.
         weight : float
             The weight of the Pokémon.
-        stats : dict
-            A dictionary of the Pokémon's base stats, keyed by stat name (e.g. "hp").
+        stats : list of StatLink
+            A list of the Pokémon's base stats, each linking a Stats entity to its base value.
         types : list of str
             A list of the types of the Pokémon.
         abilities : list of Ability
             A list of the Pokémon's abilities.
-        moves : list of Move
-            A list of the moves the Pokémon can learn.
+        moves : list of MoveLink
+            A list of the moves the Pokémon can learn, each linking a Move entity to the level it is learned at.
+        expanded : bool
+            Whether the stats, abilities and moves are rendered in full or by name only.
+        unfetched : tuple of str
+            The stats, abilities and moves of an expanded Pokémon that could not be fetched.
         """
         super().__init__(name, id)
-        self._height = height
-        self._weight = weight
-        self._stats = stats
-        self._types = types
-        self._abilities = abilities
-        self._moves = moves
-
-    @property
-    def height(self):
-        """
-        float: The height of the Pokémon.
-        """
-        return self._height
-
-    @height.setter
-    def height(self, height):
-        """
-        Set the height of the Pokémon.
-
-        Parameters:
-        -----------
-        height : float
-            The new height value to set.
-        """
-        self._height = height
+        self.height = height
+        self.weight = weight
+        self.stats = stats
+        self.types = types
+        self.abilities = abilities
+        self.moves = moves
+        self.expanded = expanded
+        self.unfetched = tuple(unfetched)
 
-    @property
-    def weight(self):
+    def render_stats(self):
         """
-        float: The weight of the Pokémon.
-        """
-        return self._weight
-
-    @weight.setter
-    def weight(self, weight):
-        """
-        Set the weight of the Pokémon.
+        Render the base stats of the Pokémon.
 
-        Parameters:
-        -----------
-        weight : float
-            The new weight value to set.
-        """
-        self._weight = weight
-
-    @property
-    def stats(self):
-        """
-        dict: A dictionary of the Pokémon's base stats, keyed by stat name (e.g. "hp").
+        Returns:
+        --------
+        str
+            Every stat in full if the Pokémon is expanded, otherwise a (name, base stat) pair per line.
         """
-        return self._stats
+        if self.expanded:
+            return "".join([str(link.stat) for link in self.stats])
+        return "".join([f"{(link.stat.name, link.base_stat)}\n" for link in self.stats])
 
-    @stats.setter
-    def stats(self, stats):
+    def render_abilities(self):
         """
-        Set the base stats of the Pokémon.
+        Render the abilities of the Pokémon.
 
-        Parameters:
-        -----------
-        stats : dict
-            A dictionary of the Pokémon's base stats, keyed by stat name (e.g. "hp").
+        Returns:
+        --------
+        str
+            Every ability in full if the Pokémon is expanded, otherwise the ability names separated by blank lines.
         """
-        self._stats = stats
+        if self.expanded:
+            return "".join([str(ability) for ability in self.abilities])
+        return "\n\n".join([ability.name for ability in self.abilities])
 
-    @property
-    def types(self):
+    def render_moves(self):
         """
-        list of str: The types of the Pokémon.
-        """
-        return self._types
+        Render the moves of the Pokémon.
 
-    @types.setter
-    def types(self, types):
+        Returns:
+        --------
+        str
+            Every move in full if the Pokémon is expanded, otherwise a (name, level) pair per move.
         """
-        Set the types of the Pokémon.
+        if self.expanded:
+            return "".join([str(link.move) for link in self.moves])
+        return "".join([f"('Move name: {link.move.name}', 'Level acquired: {link.level}')\n\n" for link in self.moves])
 
-        Parameters:
-        -----------
-        types : list of str
-            The new list of types to set.
+    def to_dict(self):
         """
-        self._types = types
+        Return the fields of the Pokémon as a dictionary, such as for serialising it to JSON.
 
-    @property
-    def abilities(self):
-        """
-        list of Ability: The abilities of the Pokémon.
+        Returns:
+        --------
+        dict
+            The fields of the Pokémon. Every stat, ability and move is a nested dictionary holding all of its fields if
+            the Pokémon is expanded, otherwise only its name, and stats and moves also hold the base stat and level.
         """
-        return self._abilities
+        fields = super().to_dict()
+        fields["stats"] = [{**self._linked(link.stat), "base_stat": link.base_stat} for link in self.stats or ()]
+        fields["abilities"] = [self._linked(ability) for ability in self.abilities or ()]
+        fields["moves"] = [{**self._linked(link.move), "level": link.level} for link in self.moves or ()]
+        fields["unfetched"] = list(self.unfetched)
+        return fields
 
-    @abilities.setter
-    def abilities(self, abilities):
+    def _linked(self, entity):
         """
-        Set the abilities of the Pokémon.
+        Return the fields of an entity the Pokémon links to.
 
         Parameters:
         -----------
-        abilities : list of Ability
-            The new list of abilities to set.
-        """
-        self._abilities = abilities
-
-    @property
-    def moves(self):
-        """
-        list of Move: The moves that the Pokémon can learn.
-        """
-        return self._moves
+        entity : PokedexObject
+            The linked Stats, Ability or Move.
 
-    @moves.setter
-    def moves(self, moves):
-        """
-        Set the moves that the Pokémon can learn.
-
-        Parameters:
-        -----------
-        moves : list of Move
-            The new list of moves to set.
+        Returns:
+        --------
+        dict
+            All fields of the entity if the Pokémon is expanded, otherwise only its name.
         """
-        self._moves = moves
+        return entity.to_dict() if self.expanded else {"name": entity.name}
 
     def __str__(self):
         """
@@ -188,6 +173,9 @@ class Pokemon(PokedexObject):
         --------
         str
             A string representation of the Pokemon object, including its name, ID, height, weight, types,
-            stats, abilities, and moves.
+            stats, abilities, and moves, followed by those that could not be fetched, if any.
         """
-        return f"Name: {self.name}\nID: {self.ID}\nHeight: {self.height}\nWeight: {self.weight}\nTypes: {self.types}\n\nStats:\n------\n{self.stats}\n\nAbilities:\n------\n{self.abilities}\n\nMoves:\n------\n\n{self.moves}"
\ No newline at end of file
+        unfetched = f"\n\nCould not be fetched:\n------\n{', '.join(self.unfetched)}\n" if self.unfetched else ""
+        return f"Name: {self.name}\nID: {self.ID}\nHeight: {self.height}\nWeight: {self.weight}\n" \
+               f"Types: {', '.join(self.types)}\n\nStats:\n------\n{self.render_stats()}\n\n" \
+               f"Abilities:\n------\n{self.render_abilities()}\n\nMoves:\n------\n\n{self.render_moves()}{unfetched}"
\ No newline at end of file
@@ -1,3 +1,27 @@
+FLAGS = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+"""The strings accepted for a boolean flag, such as expanded, mapped to their value."""
+
+
+def parse_flag(value):
+    """
+    Parse a boolean flag, given as a JSON boolean or as one of the strings of `FLAGS`.
+
+    Args:
+        value: The value of the flag.
+
+    Returns:
+        bool: The flag.
+
+    Raises:
+        ValueError: If the value is not a boolean or a known string.
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in FLAGS:
+        return FLAGS[value.strip().lower()]
+    raise ValueError(f"Expected true or false, got {value!r}.")
+
+
 class Request:
     """
        A class representing a request to the Poke-Dex API.
@@ -11,6 +35,14 @@ class Request:
            pokemon_info (list): A list of Pokemon objects containing information about the requested Pokemon.
            entity (str): The entity targeted by the request. Can be "pokemon", "ability", "move", "item", or "location".
            result (list): A list of objects containing information about the requested entity.
+           output_format (str): The format the results are written in, "text", "jsonl", "csv" or "parquet".
+           output_append (bool): Whether the output is appended to the output file instead of overwriting it.
+           rejected (dict): The positions of the inputs rejected before fetching, mapped to a suggested correction or
+               None.
+           positions (list): For every original input, the position of its normalised input in data_input, or None if
+               the inputs were not normalised.
+           input_text (list): For every input in data_input, the text it was first given as before it was normalised,
+               or None if the inputs were not normalised.
        """
 
     def __init__(self):
@@ -22,6 +54,56 @@ class Request:
         self.pokemon_info = []
         self.entity = None
         self.result = []
+        self.output_format = "text"
+        self.output_append = False
+        self.rejected = {}
+        self.positions = None
+        self.input_text = None
+
+    def window(self, data_input):
+        """
+        Create a request with the same settings as this one for a window of the input data.
+
+        Args:
+            data_input (list): The input data of the window.
+
+        Returns:
+            Request: A new request for the window, with empty info and results.
+        """
+        request = Request()
+        request.poke_dex_mode = self.poke_dex_mode
+        request.data_input = data_input
+        request.expanded = self.expanded
+        request.input_type = self.input_type
+        request.output_type = self.output_type
+        request.output_format = self.output_format
+        request.entity = self.entity
+        return request
+
+    def text_of(self, index):
+        """
+        Get the text an input was given as, such as to name it in a message.
+
+        Args:
+            index (int): The index of the input in data_input.
+
+        Returns:
+            str: The text of the input before it was normalised, or the input itself if it was not normalised.
+        """
+        if self.input_text is None:
+            return self.data_input[index]
+        return self.input_text[index]
+
+    def ordered_result(self):
+        """
+        List the results in the order of the original inputs, repeating the result of an input given more than once.
+
+        Returns:
+            list: The result of every original input, or the results as they are if the inputs were not normalised.
+        """
+        if self.positions is None:
+            return self.result
+        return [self.result[position] for position in self.positions]
 
     def __str__(self):
         return f"Poke-Dex-Mode: {self.poke_dex_mode}\nData-Input: {self.data_input}\nExpanded: {self.expanded}" \
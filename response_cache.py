@@ -0,0 +1,111 @@
+import sqlite3
+import time
+
+
+class ResponseCache:
+    """
+    A persistent cache of PokeAPI responses stored in a SQLite database, keyed by endpoint (e.g. "pokemon/25").
+
+    Responses are stored as raw bytes. Endpoints the API reported as not found are stored as the JSON body "null", so
+    invalid inputs are answered from the cache as well. Entries older than `ttl` seconds are treated as missing, and
+    once the stored bodies grow beyond `max_size` bytes the least recently used entries are evicted.
+
+    :param path: The path of the SQLite database file.
+    :param ttl: The number of seconds an entry stays valid, or None to keep entries forever.
+    :param max_size: The maximum total size in bytes of the stored bodies.
+    """
+    NOT_FOUND = b"null"
+
+    def __init__(self, path, ttl=30 * 24 * 60 * 60, max_size=256 * 1024 * 1024):
+        """
+        Constructor for the ResponseCache class. Opens, and if needed creates, the database at the given path.
+
+        :param path: The path of the SQLite database file.
+        :param ttl: The number of seconds an entry stays valid, or None to keep entries forever.
+        :param max_size: The maximum total size in bytes of the stored bodies.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self._connection = sqlite3.connect(path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS responses ("
+                                 "endpoint TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL, "
+                                 "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, end_point):
+        """
+        Get the cached body of an endpoint and mark it as recently used.
+
+        :param end_point: The endpoint of the request, relative to the API URL.
+        :return: The cached body, or None if the endpoint is not cached or its entry has expired.
+        """
+        row = self._connection.execute("SELECT body, stored_at FROM responses WHERE endpoint = ?",
+                                       (end_point,)).fetchone()
+        if row is None:
+            return None
+        body, stored_at = row
+        now = time.time()
+        if self.ttl is not None and now - stored_at > self.ttl:
+            self._delete(end_point)
+            return None
+        self._connection.execute("UPDATE responses SET accessed_at = ? WHERE endpoint = ?", (now, end_point))
+        return bytes(body)
+
+    def put(self, end_point, body):
+        """
+        Store the body of an endpoint, evicting the least recently used entries if the cache grows too large.
+
+        :param end_point: The endpoint of the request, relative to the API URL.
+        :param body: The raw body of the response.
+        """
+        self._delete(end_point)
+        now = time.time()
+        self._connection.execute("INSERT INTO responses (endpoint, body, size, stored_at, accessed_at) "
+                                 "VALUES (?, ?, ?, ?, ?)", (end_point, body, len(body), now, now))
+        self._size += len(body)
+        self._evict()
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        self._connection.execute("DELETE FROM responses")
+        self._connection.execute("VACUUM")
+        self._size = 0
+
+    def close(self):
+        """
+        Close the connection to the database.
+        """
+        self._connection.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _delete(self, end_point):
+        """
+        Remove a single entry from the cache.
+
+        :param end_point: The endpoint of the entry to remove.
+        """
+        row = self._connection.execute("SELECT size FROM responses WHERE endpoint = ?", (end_point,)).fetchone()
+        if row is not None:
+            self._connection.execute("DELETE FROM responses WHERE endpoint = ?", (end_point,))
+            self._size -= row[0]
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the stored bodies fit in `max_size`.
+        """
+        if self.max_size is None or self._size <= self.max_size:
+            return
+        rows = self._connection.execute("SELECT endpoint, size FROM responses ORDER BY accessed_at").fetchall()
+        for end_point, size in rows:
+            if self._size <= self.max_size:
+                break
+            self._connection.execute("DELETE FROM responses WHERE endpoint = ?", (end_point,))
+            self._size -= size
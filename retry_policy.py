@@ -0,0 +1,53 @@
+import random
+
+
+class RetryPolicy:
+    """
+    Decides whether, and after how long, a failed request to the PokeAPI is retried.
+
+    Timeouts, connection errors, 408 Request Timeout, 429 Too Many Requests and 5xx responses are transient and are
+    retried up to `max_attempts` times in total, waiting an exponentially growing, jittered delay between attempts.
+    Other 4xx responses, such as 404 Not Found, are permanent and are never retried.
+
+    :param max_attempts: The maximum number of attempts per request, including the first one.
+    :param backoff: The delay in seconds before the first retry. It doubles with every further retry.
+    :param max_backoff: The maximum delay in seconds between two attempts.
+    :param jitter: The fraction of the delay that is randomised, from 0 (no jitter) to 1 (full jitter).
+    :param timeout: The maximum number of seconds a single attempt may take.
+    """
+    TRANSIENT_STATUSES = frozenset({408, 425, 429})
+
+    def __init__(self, max_attempts=4, backoff=0.5, max_backoff=10.0, jitter=1.0, timeout=10.0):
+        """
+        Constructor for the RetryPolicy class.
+
+        :param max_attempts: The maximum number of attempts per request, including the first one.
+        :param backoff: The delay in seconds before the first retry. It doubles with every further retry.
+        :param max_backoff: The maximum delay in seconds between two attempts.
+        :param jitter: The fraction of the delay that is randomised, from 0 (no jitter) to 1 (full jitter).
+        :param timeout: The maximum number of seconds a single attempt may take.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = min(1.0, max(0.0, jitter))
+        self.timeout = timeout
+
+    def is_transient(self, status):
+        """
+        Check whether a response status is worth retrying.
+
+        :param status: The HTTP status of the response.
+        :return: True if the status is transient.
+        """
+        return status in self.TRANSIENT_STATUSES or status >= 500
+
+    def delay(self, attempt):
+        """
+        Get the delay before the next attempt.
+
+        :param attempt: The number of the attempt that just failed, starting at 1.
+        :return: The number of seconds to wait.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
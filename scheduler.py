@@ -0,0 +1,105 @@
+import asyncio
+import contextlib
+import email.utils
+import time
+
+
+class RequestScheduler:
+    """
+    Schedules requests to the PokeAPI, so that throughput is as high as possible without being throttled.
+
+    At most `max_in_flight` requests are in flight at the same time, and a token bucket refilled at `rate` tokens per
+    second, holding at most `burst` tokens, limits how many requests start per second. When the API answers with
+    429 Too Many Requests, `pause` holds every new request back for the time given by its Retry-After header.
+
+    :param max_in_flight: The maximum number of requests in flight at the same time.
+    :param rate: The maximum number of requests started per second, or None for no limit.
+    :param burst: The maximum number of requests started at once after an idle period. Defaults to `rate`.
+    """
+    DEFAULT_RETRY_AFTER = 1.0
+
+    def __init__(self, max_in_flight=50, rate=None, burst=None):
+        """
+        Constructor for the RequestScheduler class.
+
+        :param max_in_flight: The maximum number of requests in flight at the same time.
+        :param rate: The maximum number of requests started per second, or None for no limit.
+        :param burst: The maximum number of requests started at once after an idle period. Defaults to `rate`.
+        """
+        self.max_in_flight = max_in_flight
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else (rate or 1.0))
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._lock = asyncio.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """
+        Wait until a request may start, and hold its in-flight slot until the request is done.
+
+        Usage: `async with scheduler.slot(): ...`
+        """
+        async with self._semaphore:
+            await self._acquire_token()
+            yield
+
+    def pause(self, seconds):
+        """
+        Hold back every request that has not started yet for a number of seconds.
+
+        :param seconds: The number of seconds to pause for.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def _acquire_token(self):
+        """
+        Wait until the scheduler is not paused and a token is available, then take the token.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self._paused_until > now:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if self.rate is None:
+                    return
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def clamp(self, max_in_flight):
+        """
+        Lower the number of requests in flight at the same time to at most a number, such as the number of connections
+        the requests are sent over, so that requests wait for a slot here instead of for a connection, where the wait
+        would count against their timeout. It must be called before any request is scheduled.
+
+        :param max_in_flight: The maximum number of requests in flight at the same time.
+        """
+        if max_in_flight < self.max_in_flight:
+            self.max_in_flight = max_in_flight
+            self._semaphore = asyncio.Semaphore(max_in_flight)
+
+    @classmethod
+    def retry_after(cls, value):
+        """
+        Parse the value of a Retry-After header.
+
+        :param value: The value of the header, either a number of seconds or an HTTP date, or None.
+        :return: The number of seconds to wait before retrying.
+        """
+        if value is None:
+            return cls.DEFAULT_RETRY_AFTER
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return cls.DEFAULT_RETRY_AFTER
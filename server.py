@@ -0,0 +1,149 @@
+import json
+
+from aiohttp import web
+
+from pokedex import PokedexMode
+from output_writer import to_record
+from request import Request, parse_flag
+
+
+class PokedexServer:
+    """
+    Serves a PokeDex over HTTP as JSON, so that many lookups share one warm process.
+
+    The PokeDex, with its pooled connections, scheduler, response cache and entity cache, lives as long as the server,
+    so a lookup of an entity that was populated before is answered from memory without touching the PokeAPI.
+
+    Endpoints:
+        `GET /pokemon/{name_or_id}`, `GET /move/{name_or_id}` and `GET /ability/{name_or_id}` answer a single lookup.
+        Pokémon are expanded with `?expanded=true`. An invalid input is answered with 404 Not Found, and an `expanded`
+        that is not a boolean with 400 Bad Request.
+        `POST /batch` answers a batch of lookups of one mode, given as `{"mode": "pokemon", "inputs": [...],
+        "expanded": false}`, with `{"results": [...]}`, one result per non-blank input, in order.
+        `GET /metrics` answers with the metrics of the PokeDex in the Prometheus text format.
+
+    :param pokedex: The PokeDex to serve.
+    """
+    MODES = ("pokemon", "move", "ability")
+
+    def __init__(self, pokedex):
+        """
+        Constructor for the PokedexServer class.
+
+        :param pokedex: The PokeDex to serve.
+        """
+        self.pokedex = pokedex
+        self._runner = None
+
+    def app(self):
+        """
+        Build the web application of the server.
+
+        :return: The aiohttp application.
+        """
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_post("/batch", self.handle_batch)
+        app.router.add_get("/{mode}/{key}", self.handle_lookup)
+        return app
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """
+        Start serving.
+
+        :param host: The host to listen on.
+        :param port: The port to listen on, or 0 for a free one.
+        :return: The base URL of the server.
+        """
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}/"
+
+    async def stop(self):
+        """
+        Stop serving. The PokeDex is left open.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def lookup(self, mode, inputs, expanded=False):
+        """
+        Look up entities through the chains of the PokeDex.
+
+        :param mode: The mode of the inputs, "pokemon", "move" or "ability".
+        :param inputs: The names or ids to look up.
+        :param expanded: Whether Pokémon are expanded, as parsed by `parse_flag`.
+        :return: A list with the fields of every entity found, or an error for every invalid input, in order.
+        """
+        request = Request()
+        request.poke_dex_mode = PokedexMode(mode)
+        request.data_input = list(inputs)
+        request.expanded = expanded and mode == "pokemon"
+        request.output_type = []
+        await self.pokedex.execute_request(request)
+        return [self.serialise(result) for result in request.output_type]
+
+    @staticmethod
+    def serialise(result):
+        """
+        Convert a result of a chain to JSON-compatible data.
+
+        :param result: A populated entity, or the text describing an invalid input.
+        :return: The fields of the entity, or a dictionary holding the error.
+        """
+        return to_record(result)
+
+    async def handle_lookup(self, request):
+        """
+        Answer a single lookup.
+
+        :param request: The incoming request.
+        :return: The fields of the entity, a 404 response holding the error, or a 400 response if `expanded` is not a
+                 boolean.
+        """
+        mode = request.match_info["mode"]
+        if mode not in self.MODES:
+            raise web.HTTPNotFound(text=json.dumps({"error": f"Unknown mode '{mode}'."}),
+                                   content_type="application/json")
+        try:
+            expanded = parse_flag(request.query.get("expanded", False))
+        except ValueError as e:
+            return web.json_response({"error": f"Invalid expanded: {e}"}, status=400)
+        results = await self.lookup(mode, [request.match_info["key"]], expanded)
+        if not results or "error" in results[0]:
+            error = results[0]["error"] if results else "No input was given."
+            return web.json_response({"error": error}, status=404)
+        return web.json_response(results[0])
+
+    async def handle_batch(self, request):
+        """
+        Answer a batch of lookups of one mode.
+
+        :param request: The incoming request, holding the mode, the inputs and whether Pokémon are expanded as JSON.
+        :return: The results of every input, or a 400 response if the batch is malformed.
+        """
+        try:
+            batch = await request.json()
+            mode, inputs = batch["mode"], batch["inputs"]
+        except (ValueError, KeyError, TypeError):
+            return web.json_response({"error": "Expected {\"mode\": ..., \"inputs\": [...]}."}, status=400)
+        try:
+            expanded = parse_flag(batch.get("expanded", False))
+        except ValueError as e:
+            return web.json_response({"error": f"Invalid expanded: {e}"}, status=400)
+        if mode not in self.MODES or not isinstance(inputs, list):
+            return web.json_response({"error": f"Expected a mode of {', '.join(self.MODES)} and a list of inputs."},
+                                     status=400)
+        return web.json_response({"results": await self.lookup(mode, inputs, expanded)})
+
+    async def handle_metrics(self, request):
+        """
+        Answer with the metrics of the PokeDex.
+
+        :param request: The incoming request.
+        :return: The metrics in the Prometheus text format.
+        """
+        return web.Response(text=self.pokedex.report_metrics("prometheus"))
@@ -0,0 +1,315 @@
+import asyncio
+import json
+import os
+import time
+
+from decoder import JSONDecoder, prune
+from metrics import Metrics
+
+
+class Snapshot:
+    """
+    A local copy of PokeAPI data, laid out like the API.
+
+    Every resource is stored as `<root>/<mode>/<id>.json` (e.g. `pokemon/25.json`) and `<root>/index.json` maps the
+    name of every resource to its id, per mode, so a lookup by either key opens exactly one file.
+
+    :param root: The directory of the snapshot.
+    """
+    INDEX_FILE = "index.json"
+
+    def __init__(self, root):
+        """
+        Constructor for the Snapshot class.
+
+        :param root: The directory of the snapshot.
+        """
+        self.root = root
+        self._index = None
+
+    @property
+    def index(self):
+        """
+        The name to id index of the snapshot, loaded on first use.
+
+        :return: A dictionary mapping every mode to a dictionary of names to ids.
+        """
+        if self._index is None:
+            path = os.path.join(self.root, self.INDEX_FILE)
+            if os.path.exists(path):
+                with open(path) as file:
+                    self._index = json.load(file)
+            else:
+                self._index = {}
+        return self._index
+
+    def path_of(self, mode, single_input):
+        """
+        Get the path of the file holding a resource.
+
+        :param mode: The mode of the resource.
+        :param single_input: The name or the id of the resource.
+        :return: The path of the file, or None if the name is not in the index.
+        """
+        key = str(single_input)
+        if key.isdecimal():
+            key = str(int(key))
+        else:
+            key = self.index.get(mode, {}).get(key)
+            if key is None:
+                return None
+        return os.path.join(self.root, mode, f"{key}.json")
+
+    def read(self, mode, single_input):
+        """
+        Read the raw JSON of a resource.
+
+        :param mode: The mode of the resource.
+        :param single_input: The name or the id of the resource.
+        :return: The raw JSON of the resource, or None if it is not in the snapshot.
+        """
+        path = self.path_of(mode, single_input)
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, "rb") as file:
+            return file.read()
+
+    def contains(self, mode, single_input):
+        """
+        Check whether a resource is in the snapshot.
+
+        :param mode: The mode of the resource.
+        :param single_input: The name or the id of the resource.
+        :return: True if the file of the resource exists.
+        """
+        path = self.path_of(mode, single_input)
+        return path is not None and os.path.exists(path)
+
+    def add(self, mode, data):
+        """
+        Write a resource into the snapshot and add its name to the index. The index is only written by `save_index`.
+
+        :param mode: The mode of the resource.
+        :param data: The JSON of the resource, as returned by the API.
+        """
+        os.makedirs(os.path.join(self.root, mode), exist_ok=True)
+        path = os.path.join(self.root, mode, f"{data['id']}.json")
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(f"{path}.tmp", path)
+        self.index.setdefault(mode, {})[data["name"]] = data["id"]
+
+    def seed(self, mode, paths):
+        """
+        Add resources to the snapshot from JSON files, such as the ones in `testjsons/`, and save the index.
+
+        :param mode: The mode of the resources.
+        :param paths: The paths of the JSON files.
+        """
+        for path in paths:
+            with open(path) as file:
+                self.add(mode, json.load(file))
+        self.save_index()
+
+    def save_index(self):
+        """
+        Write the name to id index of the snapshot to disk.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, self.INDEX_FILE)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(self.index, file, separators=(",", ":"))
+        os.replace(f"{path}.tmp", path)
+
+
+class SnapshotClient:
+    """
+    A client that answers lookups from a local Snapshot instead of the PokeAPI, for running without network access.
+
+    It can be used by the handlers wherever a PokeAPIClient is expected.
+
+    :param snapshot: The snapshot to read resources from.
+    :param decoder: The decoder of the stored resources. Defaults to a JSONDecoder using the fastest installed backend.
+    """
+
+    def __init__(self, snapshot, decoder=None):
+        """
+        Constructor for the SnapshotClient class.
+
+        :param snapshot: The snapshot to read resources from.
+        :param decoder: The decoder of the stored resources. Defaults to a JSONDecoder using the fastest installed
+                        backend.
+        """
+        self.snapshot = snapshot
+        self.decoder = decoder if decoder is not None else JSONDecoder()
+        self.metrics = Metrics()
+
+    async def get_request(self, mode, single_input):
+        """
+        Get the JSON of a single resource from the snapshot.
+
+        :param mode: The mode of the resource.
+        :param single_input: The name or the id of the resource.
+        :return: The JSON of the resource, or None if it is not in the snapshot. A query such as `?limit=100` is
+                 answered with a listing of every resource of the mode, like the PokeAPI does.
+        """
+        if str(single_input).startswith("?"):
+            return self.listing(mode)
+        content = self.snapshot.read(mode, single_input)
+        if content is None:
+            self.metrics.increment("request_failures")
+            return None
+        self.metrics.increment("bytes_fetched", len(content))
+        with self.metrics.stage("JSON decoding", 1):
+            return self.decoder.decode(content, mode)
+
+    def listing(self, mode):
+        """
+        List every resource of a mode from the index of the snapshot.
+
+        :param mode: The mode to list.
+        :return: A listing shaped like the one of the PokeAPI, or None if the snapshot holds no resource of the mode.
+        """
+        names = self.snapshot.index.get(mode)
+        if not names:
+            self.metrics.increment("request_failures")
+            return None
+        return {"count": len(names),
+                "results": [{"name": name, "url": f"{mode}/{resource_id}/"} for name, resource_id in names.items()]}
+
+    def clear_requests(self):
+        """
+        Does nothing, as reads from the snapshot are not coalesced.
+        """
+
+    async def close(self):
+        """
+        Does nothing, as the snapshot holds no open resources.
+        """
+
+
+class SnapshotBuilder:
+    """
+    Mirrors the PokeAPI into a compact local Snapshot.
+
+    The names of every resource of each mode are listed first, then every resource that is not in the snapshot yet
+    is fetched through the client with bounded concurrency, compacted and written. Because resources already in the
+    snapshot are skipped and the index is saved regularly, an interrupted build resumes where it stopped.
+
+    :param client: The client used to fetch resources from the PokeAPI.
+    :param snapshot: The snapshot to write resources to.
+    :param modes: The modes to mirror.
+    :param concurrency: The maximum number of resources fetched at the same time.
+    :param report_every: The number of seconds between progress reports.
+    """
+    MODES = ("pokemon", "move", "ability", "stat")
+    LIST_LIMIT = 100000
+    SAVE_EVERY = 100
+
+    def __init__(self, client, snapshot, modes=MODES, concurrency=20, report_every=2.0):
+        """
+        Constructor for the SnapshotBuilder class.
+
+        :param client: The client used to fetch resources from the PokeAPI.
+        :param snapshot: The snapshot to write resources to.
+        :param modes: The modes to mirror.
+        :param concurrency: The maximum number of resources fetched at the same time.
+        :param report_every: The number of seconds between progress reports.
+        """
+        self._client = client
+        self._snapshot = snapshot
+        self._modes = modes
+        self._concurrency = concurrency
+        self._report_every = report_every
+
+    async def build(self):
+        """
+        Mirror every mode into the snapshot, reporting progress while doing so.
+
+        :return: A dictionary of statistics about the build.
+        """
+        totals = {"fetched": 0, "skipped": 0, "failed": 0, "seconds": 0.0}
+        start = time.perf_counter()
+        try:
+            for mode in self._modes:
+                stats = await self.build_mode(mode)
+                for key in ("fetched", "skipped", "failed"):
+                    totals[key] += stats[key]
+        finally:
+            self._snapshot.save_index()
+        totals["seconds"] = time.perf_counter() - start
+        totals["per_second"] = totals["fetched"] / totals["seconds"] if totals["seconds"] else 0.0
+        return totals
+
+    async def build_mode(self, mode):
+        """
+        Mirror every resource of a single mode into the snapshot.
+
+        :param mode: The mode to mirror.
+        :return: A dictionary of statistics about the mode.
+        """
+        listing = await self._client.get_request(mode, f"?limit={self.LIST_LIMIT}")
+        names = [] if listing is None else [result["name"] for result in listing["results"]]
+        pending = [name for name in names if not self._snapshot.contains(mode, name)]
+        stats = {"mode": mode, "total": len(names), "skipped": len(names) - len(pending), "fetched": 0, "failed": 0}
+
+        queue = asyncio.Queue()
+        for name in pending:
+            queue.put_nowait(name)
+        start = time.perf_counter()
+        workers = [asyncio.create_task(self._work(mode, queue, stats)) for _ in range(self._concurrency)]
+        reporter = asyncio.create_task(self._report(stats, start))
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            reporter.cancel()
+        self.print_progress(stats, start)
+        return stats
+
+    async def _work(self, mode, queue, stats):
+        """
+        Fetch, compact and write resources until the queue is empty.
+
+        :param mode: The mode of the resources.
+        :param queue: The queue of names still to fetch.
+        :param stats: The statistics of the mode, updated in place.
+        """
+        while not queue.empty():
+            name = queue.get_nowait()
+            data = await self._client.get_request(mode, name)
+            if not isinstance(data, dict):
+                stats["failed"] += 1
+                continue
+            self._snapshot.add(mode, prune(mode, data))
+            stats["fetched"] += 1
+            if stats["fetched"] % self.SAVE_EVERY == 0:
+                self._snapshot.save_index()
+                self._client.clear_requests()
+
+    async def _report(self, stats, start):
+        """
+        Print the progress of a mode at a regular interval.
+
+        :param stats: The statistics of the mode.
+        :param start: The time at which the mode started.
+        """
+        while True:
+            await asyncio.sleep(self._report_every)
+            self.print_progress(stats, start)
+
+    @staticmethod
+    def print_progress(stats, start):
+        """
+        Print the progress and the throughput of a mode.
+
+        :param stats: The statistics of the mode.
+        :param start: The time at which the mode started.
+        """
+        done = stats["skipped"] + stats["fetched"] + stats["failed"]
+        elapsed = time.perf_counter() - start
+        percent = 100 * done / stats["total"] if stats["total"] else 100.0
+        rate = stats["fetched"] / elapsed if elapsed else 0.0
+        print(f"{stats['mode']}: {done}/{stats['total']} ({percent:.1f}%), {stats['fetched']} fetched, "
+              f"{stats['skipped']} skipped, {stats['failed']} failed, {rate:.1f} resources/s")
@@ -18,6 +18,7 @@ class Stats(PokedexObject):
           height (float): The height of the Pokémon in meters.
           weight (float): The weight of the Pokémon in kilograms.
       """
+    __slots__ = ("is_battle", "move_damage_class")
 
     def __init__(self, name=None, ID=None, is_battle=None, move_damage_class=None):
         """
@@ -30,24 +31,8 @@ class Stats(PokedexObject):
                     move_damage_class (str, optional): The damage class of the Pokémon's moves. Defaults to None.
                 """
         super().__init__(name, ID)
-        self._is_battle = is_battle
-        self._move_damage_class = move_damage_class
-
-    @property
-    def is_battle(self):
-        return self._is_battle
-
-    @is_battle.setter
-    def is_battle(self, is_battle):
-        self._is_battle = is_battle
-
-    @property
-    def move_damage_class(self):
-        return self._move_damage_class
-
-    @move_damage_class.setter
-    def move_damage_class(self, move_damage_class):
-        self._move_damage_class = move_damage_class
+        self.is_battle = is_battle
+        self.move_damage_class = move_damage_class
 
     def __str__(self):
         return f"\nName: {self.name}\n" \
@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+
+from handlers import Handler, RouteHandler
+from pokedex import PokedexMode
+from request import Request
+
+
+class EchoHandler(Handler):
+    """
+    A route that answers every input with the route it was sent down.
+    """
+
+    def __init__(self, route):
+        super().__init__()
+        self.route = route
+
+    async def process(self, request):
+        request.output_type.extend(f"{self.route} {single_input}" for single_input in request.data_input)
+
+
+class RouteHandlerTest(unittest.TestCase):
+    """
+    Tests for the parsing of the expanded field of the items of a batch.
+    """
+
+    def setUp(self):
+        self.handler = RouteHandler({route: EchoHandler(route) for route in ("pokemon", "pokemon-expanded", "move")})
+
+    def test_boolean_expanded(self):
+        self.assertEqual(self.handler.parse('{"mode": "pokemon", "input": "pikachu", "expanded": true}'),
+                         ("pokemon-expanded", "pikachu"))
+        self.assertEqual(self.handler.parse('{"mode": "pokemon", "input": "pikachu", "expanded": false}', True),
+                         ("pokemon", "pikachu"))
+
+    def test_string_expanded(self):
+        for value, route in (("true", "pokemon-expanded"), ("yes", "pokemon-expanded"), ("false", "pokemon"),
+                             ("no", "pokemon"), ("0", "pokemon")):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    self.handler.parse(f'{{"mode": "pokemon", "input": "pikachu", "expanded": "{value}"}}'),
+                    (route, "pikachu"))
+
+    def test_missing_expanded_uses_default(self):
+        self.assertEqual(self.handler.parse('{"mode": "pokemon", "input": "pikachu"}', True),
+                         ("pokemon-expanded", "pikachu"))
+
+    def test_non_boolean_expanded_is_invalid(self):
+        for value in ('"maybe"', "1", "null", "[]", '{"a": 1}'):
+            with self.subTest(value=value):
+                self.assertIsNone(self.handler.parse(f'{{"mode": "pokemon", "input": "pikachu", "expanded": {value}}}'))
+
+    def test_non_boolean_expanded_is_reported_as_invalid_input(self):
+        item = '{"mode": "pokemon", "input": "pikachu", "expanded": "maybe"}'
+        request = Request()
+        request.poke_dex_mode = PokedexMode.BATCH
+        request.data_input = ["move:pound", item]
+        request.expanded = False
+        asyncio.run(self.handler.process(request))
+        self.assertEqual(request.result, ["move pound", f"\n{item} is not valid. Skipping this request.\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()
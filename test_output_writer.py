@@ -0,0 +1,53 @@
+import asyncio
+import json
+import tempfile
+import types
+import unittest
+
+from handlers import ReverseLookupHandler
+from inverted_index import InvertedIndex
+from output_writer import JsonLinesWriter
+from pokedex import PokedexMode
+from request import Request
+
+
+class JsonLinesWriterTest(unittest.TestCase):
+    """
+    Tests for the JSON lines written for the results of reverse lookups.
+    """
+
+    def lookup(self, mode, inputs):
+        """
+        Answer reverse lookups from a small inverted index and render their results as JSON lines.
+
+        :param mode: The reverse lookup mode.
+        :param inputs: The inputs to look up.
+        :return: The parsed JSON line of every result.
+        """
+        with tempfile.TemporaryDirectory() as root:
+            index = InvertedIndex(types.SimpleNamespace(root=root))
+            index._indexes = {"type": {"electric": ["pikachu", "raichu"]},
+                              "move-generation": {"generation-i": ["pound"]},
+                              "ability-generation": {"generation-i": ["static"]}}
+            request = Request()
+            request.poke_dex_mode = PokedexMode(mode)
+            request.data_input = inputs
+            asyncio.run(ReverseLookupHandler(index).process(request))
+        return [json.loads(line) for line in JsonLinesWriter().render(request.result)]
+
+    def test_hit_is_written_as_data(self):
+        self.assertEqual(self.lookup("pokemon-by-type", ["electric"]),
+                         [{"mode": "pokemon-by-type", "key": "electric", "names": {"type": ["pikachu", "raichu"]}}])
+
+    def test_hit_in_several_indexes(self):
+        self.assertEqual(self.lookup("generation", ["generation-i"]),
+                         [{"mode": "generation", "key": "generation-i",
+                           "names": {"move-generation": ["pound"], "ability-generation": ["static"]}}])
+
+    def test_miss_is_written_as_error(self):
+        self.assertEqual(self.lookup("pokemon-by-type", ["plasma"]),
+                         [{"error": "plasma is not valid. Skipping this request."}])
+
+
+if __name__ == "__main__":
+    unittest.main()